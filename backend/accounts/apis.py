@@ -1,5 +1,9 @@
+import asyncio
+import json
 import jwt
+import math
 import random
+from itertools import islice
 from datetime import datetime, timedelta
 from django.conf import settings
 from portal.base import BaseAPIView
@@ -10,7 +14,14 @@ from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views import View
 from accounts.models import User
+from accounts.login import (
+    BUSY, THROTTLED, LoginBusy, client_ip, credentials, login_payload, record_failure, refusal, submit_check,
+    throttle,
+)
+from accounts.onboarding import ImportFormatError, guess_format, import_upload, read_rows, text_stream
 from accounts.serializers import (
     UserRegisterSerailizer,
     UserSerializer,
@@ -21,53 +32,74 @@ SECRET_KEY = settings.SECRET_KEY
 
 class LoginApiView(APIView):
     def post(self, request):
-        email = request.data.get('email')
-        password = request.data.get('password')
-        
-        if not email or not password:
+        given = credentials(request.data)
+        if given is None:
             return Response(
                 {'message': 'Email and password are required'},
                 status=400
             )
-        
+        email, password = given
+
+        wait = throttle(email, client_ip(request))
+        if wait:
+            return Response({'message': THROTTLED}, status=429, headers={'Retry-After': str(math.ceil(wait))})
+
+        user = User.objects.filter(email=email).first()
         try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return Response(
-                {'message': 'Invalid credentials'},
-                status=400
-            )
-        
-        # Check password
-        if not user.check_password(password):
-            return Response(
-                {'message': 'Invalid credentials'},
-                status=400
-            )
-        
-        # Check if user is active
-        if not user.is_active:
-            return Response(
-                {'message': 'Account is not active. Please verify your account.'},
-                status=403
-            )
-        
-        payload = {
-            'user_id': str(user.id),
-            'exp': datetime.utcnow() + timedelta(days=7)
-        }
-        token = jwt.encode(payload, SECRET_KEY, algorithm='HS256')  
-        
-        return Response({
-            'full_name': user.full_name,
-            'username': user.username,
-            'user_id': str(user.id),
-            'user_type': user.user_type,
-            'phone': user.phone,
-            'email': user.email,
-            'token': token,
-            'message': 'Login successful'
-        })
+            matches, new_hash = submit_check(user.password if user else None, password).result()
+        except LoginBusy:
+            return Response({'message': BUSY}, status=503, headers={'Retry-After': '1'})
+        if new_hash:
+            # the hasher policy changed since this password was stored
+            User.objects.filter(pk=user.pk).update(password=new_hash)
+
+        if not matches:
+            record_failure(email)
+        refused = refusal(user, matches)
+        if refused:
+            return Response({'message': refused[1]}, status=refused[0])
+        return Response(login_payload(user))
+
+
+class AsyncLoginApiView(View):
+    """LoginApiView for ASGI: waiting on the password check doesn't hold a thread."""
+
+    def respond(self, data, status=200, headers=None):
+        return JsonResponse(data, status=status, headers=headers)
+
+    async def post(self, request):
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return self.respond({'message': 'Invalid JSON'}, status=400)
+        else:
+            data = request.POST
+        if not isinstance(data, dict):
+            data = {}
+        given = credentials(data)
+        if given is None:
+            return self.respond({'message': 'Email and password are required'}, status=400)
+        email, password = given
+
+        wait = throttle(email, client_ip(request))
+        if wait:
+            return self.respond({'message': THROTTLED}, status=429, headers={'Retry-After': str(math.ceil(wait))})
+
+        user = await User.objects.filter(email=email).afirst()
+        try:
+            matches, new_hash = await asyncio.wrap_future(submit_check(user.password if user else None, password))
+        except LoginBusy:
+            return self.respond({'message': BUSY}, status=503, headers={'Retry-After': '1'})
+        if new_hash:
+            await User.objects.filter(pk=user.pk).aupdate(password=new_hash)
+
+        if not matches:
+            record_failure(email)
+        refused = refusal(user, matches)
+        if refused:
+            return self.respond({'message': refused[1]}, status=refused[0])
+        return self.respond(login_payload(user))
 
 
 class UserProfileAPIView(APIView):
@@ -152,3 +184,27 @@ class UserRegistrationAPI(APIView):
     
 
 
+class FarmerImportAPI(APIView):
+    """
+    Admin only: create farmer accounts from an uploaded CSV, JSON or NDJSON
+    `file` (format from ?type=csv|json|ndjson or the file name). Answers with the number
+    created and the errors of the rows that were skipped. Takes up to
+    ONBOARDING_UPLOAD_MAX_ROWS rows; bigger files go through `manage.py onboard_farmers`.
+    """
+
+    def post(self, request):
+        if not getattr(request.user, 'is_admin', False):
+            return Response({'msg': "Only admins can import farmers"}, status=403)
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'msg': "Upload the farmers as `file`"}, status=400)
+        fmt = request.query_params.get('type') or guess_format(file.name)
+        limit = settings.ONBOARDING_UPLOAD_MAX_ROWS
+        try:
+            rows = list(islice(read_rows(text_stream(file), fmt), limit + 1))
+            if len(rows) > limit:
+                return Response({'msg': f"At most {limit} farmers per upload, import bigger files with `manage.py onboard_farmers`"}, status=400)
+            report = import_upload(rows)
+        except ImportFormatError as e:
+            return Response({'msg': str(e)}, status=400)
+        return Response(report, status=200)
@@ -1,5 +1,66 @@
-from rest_framework.authentication import SessionAuthentication
+import copy
+import time
+import uuid
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.authentication import BaseAuthentication, SessionAuthentication
+from portal.cache import TTLCache
+
+# Per-process caches in front of jwt.decode and the user lookup. Saving or
+# deleting a User drops it here (accounts.signals); other processes pick the
+# change up once the entry's TTL runs out.
+token_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+user_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     def enforce_csrf(self, request):
-        return  # To not perform the csrf check previously happening
\ No newline at end of file
+        return  # To not perform the csrf check previously happening.
+
+
+def decode_token(token):
+    """User id of a JWT; raises jwt.InvalidTokenError or ValueError for bad tokens."""
+    cached = token_cache.get(token)
+    if cached is not None:
+        user_id, exp = cached
+        if exp is None or exp > time.time():
+            return user_id
+        token_cache.pop(token)
+    data = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+    user_id = uuid.UUID(str(data.get("user_id")))
+    token_cache.set(token, (user_id, data.get("exp")))
+    return user_id
+
+
+def get_user(user_id):
+    """The user of a token, or None when it no longer exists."""
+    from .models import User
+    user = user_cache.get(user_id)
+    if user is None:
+        user = User.objects.filter(id=user_id).first()
+        if user is None:
+            return None
+        user_cache.set(user_id, user)
+    # callers may modify their user, the cached one stays as loaded
+    return copy.copy(user)
+
+
+async def aget_user(user_id):
+    user = user_cache.get(user_id)
+    if user is None:
+        return await sync_to_async(get_user)(user_id)
+    return copy.copy(user)
+
+
+class MiddlewareUserAuthentication(BaseAuthentication):
+    """Hands DRF the user AuthMiddleware checked and put on the request."""
+
+    def authenticate(self, request):
+        user = getattr(request._request, 'token_user', None)
+        if user is not None:
+            return (user, None)
+        return None
+
+    def authenticate_header(self, request):
+        return 'Bearer'
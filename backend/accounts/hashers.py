@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the work factor from settings.PBKDF2_ITERATIONS.
+    Stored hashes made with another count are rewritten at the next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import jwt
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from portal.cache import RateLimit
+
+# Password checks are the expensive part of a login. They run on a small
+# thread pool (hashlib releases the GIL while hashing) so a burst of logins
+# can use at most LOGIN_HASH_WORKERS cores; past LOGIN_HASH_QUEUE waiting
+# checks new logins are turned away instead of queueing. Rate limits per
+# client IP and per account cap how many checks anyone can ask for; the
+# account limit only counts wrong passwords, so successful logins never use
+# it up.
+
+
+class LoginBusy(Exception):
+    pass
+
+
+_executor = None
+_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_QUEUE)
+
+limits = {
+    scope: RateLimit(f'login-{scope}', capacity, period)
+    for scope, (capacity, period) in settings.LOGIN_RATE_LIMITS.items()
+}
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.LOGIN_HASH_WORKERS, thread_name_prefix='login')
+    return _executor
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR') or ''
+
+
+def credentials(data):
+    """(email, password) from the request body, None unless both are non-empty strings."""
+    email, password = data.get('email'), data.get('password')
+    if isinstance(email, str) and isinstance(password, str) and email and password:
+        return email, password
+    return None
+
+
+def account_key(email):
+    return email.strip().lower()
+
+
+def throttle(email, ip):
+    """Seconds the client has to wait before trying again, 0 if it may try now."""
+    return limits['ip'].take(ip) or limits['account'].peek(account_key(email))
+
+
+def record_failure(email):
+    """Count a wrong password against the account's limit."""
+    limits['account'].take(account_key(email))
+
+
+def verify(encoded, password):
+    """(password matches, new hash when the stored one is below the hasher policy)"""
+    if encoded is None:
+        # no such user: hash anyway so the answer takes as long as a wrong password
+        make_password(password)
+        return False, None
+    upgraded = []
+    matches = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return matches, upgraded[0] if upgraded else None
+
+
+def submit_check(encoded, password):
+    """Future of verify() on the login pool; raises LoginBusy when the pool is backed up."""
+    if not _slots.acquire(blocking=False):
+        raise LoginBusy
+    future = get_executor().submit(verify, encoded, password)
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def refusal(user, matches):
+    """(status, message) when the login is refused, None when it goes through."""
+    if user is None or not matches:
+        return 400, 'Invalid credentials'
+    if not user.is_active:
+        return 403, 'Account is not active. Please verify your account.'
+    return None
+
+
+THROTTLED = 'Too many login attempts. Please try again later.'
+BUSY = 'Too many logins in progress. Please try again shortly.'
+
+
+def login_payload(user):
+    payload = {
+        'user_id': str(user.id),
+        'exp': datetime.utcnow() + timedelta(days=7)
+    }
+    token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+    return {
+        'full_name': user.full_name,
+        'username': user.username,
+        'user_id': str(user.id),
+        'user_type': user.user_type,
+        'phone': user.phone,
+        'email': user.email,
+        'token': token,
+        'message': 'Login successful'
+    }
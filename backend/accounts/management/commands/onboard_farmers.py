@@ -0,0 +1,34 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from accounts.onboarding import ImportFormatError, guess_format, import_farmers, read_rows, text_stream
+
+
+class Command(BaseCommand):
+    help = 'Create farmer accounts (User + Farmer profile) from a CSV, JSON or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='file with phone, full_name and optionally email, username, password, gender, district, region')
+        parser.add_argument('--format', choices=['csv', 'json', 'ndjson'], help='defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, help='rows validated and written together')
+        parser.add_argument('--workers', type=int, help='password hashing processes, 1 hashes in this process')
+        parser.add_argument('--errors', help='write the per-row errors to this JSON file instead of stdout')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or guess_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as file:
+                report = import_farmers(
+                    read_rows(text_stream(file), fmt), options['chunk_size'], options['workers'], self.progress,
+                )
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+        if options['errors']:
+            with open(options['errors'], 'w') as file:
+                json.dump(report['errors'], file, indent=2)
+        else:
+            for error in report['errors']:
+                self.stdout.write(self.style.WARNING(f"row {error['row']}: {json.dumps(error['errors'])}"))
+        self.stdout.write(self.style.SUCCESS(f"Created {report['created']} farmers, {report['failed']} rows failed"))
+
+    def progress(self, report):
+        self.stdout.write(f"{report['created']} created, {report['failed']} failed so far")
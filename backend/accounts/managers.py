@@ -19,7 +19,6 @@ class MyUserManager(BaseUserManager):
 
     
     def create_superuser(self, phone, email=None,full_name="Super Admin",gender="MALE", password=None, **kwargs):
-            print('kwargskwargs', kwargs)
             user = self.create_user(
                 phone=phone,
                 full_name=full_name,
@@ -4,16 +4,18 @@ from .managers import MyUserManager
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractBaseUser 
 
+phone_validator = RegexValidator(
+    regex=r'^[0-9+]*$',
+    message="Enter a valid phone number with numbers and '+' only",
+)
+
 class User(AbstractBaseUser):
     id = models.UUIDField(primary_key=True, default=uuid4)
     username = models.CharField(max_length=128, unique=True, blank=True)
     phone = models.CharField(
         max_length=15,  
         unique=True,
-        validators=[RegexValidator(
-            regex=r'^[0-9+]*$',
-            message="Enter a valid phone number with numbers and '+' only",
-        )]
+        validators=[phone_validator]
     )   
     ROLES = (
         ('FARMERS', 'FARMERS'),
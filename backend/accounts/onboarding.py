@@ -0,0 +1,212 @@
+import csv
+import io
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from portal.bulk import send_save_signals
+from crop.models import Farmer
+from .models import User
+from .serializers import FarmerImportSerializer
+
+# Bulk import of farmers (accounts.User with user_type FARMERS plus their
+# crop.Farmer profile) from CSV or JSON. Rows are read lazily and handled a
+# chunk at a time: validated together, uniqueness checked with one query per
+# column, passwords hashed on a process pool and the rows written with
+# bulk_create. Bad rows are reported by line and don't stop the rest.
+# Uploads through the API are capped at ONBOARDING_UPLOAD_MAX_ROWS and hash
+# on a small thread pool shared by the web process (hashlib releases the GIL)
+# instead of starting processes per request; large files go through the
+# onboard_farmers command.
+
+UNIQUE_FIELDS = ('phone', 'email', 'username')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def read_rows(stream, fmt):
+    """Dicts from a text stream: CSV with a header row, a JSON list, or one JSON object per line."""
+    if fmt == 'csv':
+        return csv.DictReader(stream)
+    if fmt == 'json':
+        try:
+            rows = json.load(stream)
+        except ValueError as e:
+            raise ImportFormatError(f"Invalid JSON: {e}")
+        if not isinstance(rows, list):
+            raise ImportFormatError("Expected a JSON list of farmers")
+        return iter(rows)
+    if fmt == 'ndjson':
+        return _json_lines(stream)
+    raise ImportFormatError("Format must be csv, json or ndjson")
+
+
+def _json_lines(stream):
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ImportFormatError(f"Invalid JSON on line {number}: {e}")
+
+
+def guess_format(name):
+    extension = name.rpartition('.')[2].lower()
+    return extension if extension in ('csv', 'json', 'ndjson') else 'csv'
+
+
+def text_stream(file):
+    """Uploaded or opened binary file as text; a UTF-8 BOM from spreadsheets is dropped."""
+    return io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+
+
+_upload_pool = None
+
+
+def get_upload_pool():
+    global _upload_pool
+    if _upload_pool is None:
+        _upload_pool = ThreadPoolExecutor(max_workers=settings.ONBOARDING_UPLOAD_HASH_THREADS, thread_name_prefix='onboarding')
+    return _upload_pool
+
+
+def _setup_worker():
+    import django
+    django.setup()
+
+
+class FarmerImporter:
+    def __init__(self, chunk_size=None, workers=None, pool=None):
+        """`pool` is an executor to hash on instead of starting a process pool; it is left running."""
+        self.chunk_size = chunk_size or settings.ONBOARDING_CHUNK_SIZE
+        self.workers = workers if workers is not None else settings.ONBOARDING_HASH_WORKERS
+        self.pool = pool
+        self.own_pool = pool is None
+        self.seen = {field: set() for field in UNIQUE_FIELDS}
+        self.created = 0
+        self.errors = []
+
+    def __enter__(self):
+        if self.pool is None and self.workers > 1:
+            # spawned workers set Django up from scratch instead of forking a
+            # process that may already be running threads
+            self.pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=_setup_worker,
+            )
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None and self.own_pool:
+            self.pool.shutdown()
+
+    def run(self, rows, on_chunk=None):
+        """Import the rows; returns the report, optionally calling on_chunk(report) as it goes."""
+        rows = enumerate(rows, start=1)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+            if on_chunk:
+                on_chunk(self.report())
+        return self.report()
+
+    def report(self):
+        errors = sorted(self.errors, key=lambda error: error['row'])
+        return {'created': self.created, 'failed': len(errors), 'errors': errors}
+
+    def fail(self, line, errors):
+        self.errors.append({'row': line, 'errors': errors})
+
+    def import_chunk(self, chunk):
+        valid = []
+        for line, row in chunk:
+            if not isinstance(row, dict):
+                self.fail(line, {'non_field_errors': ["Expected an object"]})
+                continue
+            # blank CSV cells count as not given
+            serializer = FarmerImportSerializer(data={key: value for key, value in row.items() if key and value not in (None, '')})
+            if serializer.is_valid():
+                valid.append((line, serializer.validated_data))
+            else:
+                self.fail(line, serializer.errors)
+        valid = self.check_unique(valid)
+        if not valid:
+            return
+        users = [self.build_user(data) for _, data in valid]
+        for user, password in zip(users, self.hash_passwords([data.get('password') for _, data in valid])):
+            user.password = password
+        try:
+            self.save(users)
+        except IntegrityError:
+            # someone registered the same phone or email meanwhile: find the row
+            for (line, _), user in zip(valid, users):
+                try:
+                    self.save([user])
+                except IntegrityError:
+                    self.fail(line, {'non_field_errors': ["A user with this phone, email or username already exists."]})
+
+    def check_unique(self, valid):
+        existing = {}
+        for field in UNIQUE_FIELDS:
+            values = {data[field] for _, data in valid if data.get(field)}
+            existing[field] = set(User.objects.filter(**{f'{field}__in': values}).values_list(field, flat=True))
+        unique = []
+        for line, data in valid:
+            errors = {
+                field: [f"A user with this {field} already exists."]
+                for field in UNIQUE_FIELDS
+                if data.get(field) and (data[field] in existing[field] or data[field] in self.seen[field])
+            }
+            if errors:
+                self.fail(line, errors)
+                continue
+            for field in UNIQUE_FIELDS:
+                if data.get(field):
+                    self.seen[field].add(data[field])
+            unique.append((line, data))
+        return unique
+
+    def build_user(self, data):
+        data = dict(data)
+        data.pop('password', None)
+        user = User(user_type='FARMERS', is_active=True, **data)
+        # what User.save() would fill in; bulk_create doesn't call it
+        if not user.username:
+            user.username = user.email or f"user_{str(user.id)[:8]}"
+        return user
+
+    def hash_passwords(self, passwords):
+        """Hashes in input order; rows without a password get an unusable one."""
+        to_hash = [password for password in passwords if password]
+        if self.pool is not None and len(to_hash) > self.workers:
+            hashed = iter(self.pool.map(make_password, to_hash, chunksize=max(1, len(to_hash) // (self.workers * 4))))
+        else:
+            hashed = map(make_password, to_hash)
+        return [next(hashed) if password else make_password(None) for password in passwords]
+
+    def save(self, users):
+        farmers = [Farmer(user=user) for user in users]
+        with transaction.atomic():
+            send_save_signals(User, users, True, when='pre')
+            send_save_signals(Farmer, farmers, True, when='pre')
+            User.objects.bulk_create(users)
+            Farmer.objects.bulk_create(farmers)
+            send_save_signals(User, users, True)
+            send_save_signals(Farmer, farmers, True)
+        self.created += len(users)
+
+
+def import_farmers(rows, chunk_size=None, workers=None, on_chunk=None, pool=None):
+    with FarmerImporter(chunk_size, workers, pool) as importer:
+        return importer.run(rows, on_chunk)
+
+
+def import_upload(rows):
+    """Import the rows of an API upload on the shared thread pool."""
+    return import_farmers(rows, workers=settings.ONBOARDING_UPLOAD_HASH_THREADS, pool=get_upload_pool())
@@ -1,6 +1,6 @@
 
 from rest_framework import serializers
-from .models import User
+from .models import User, phone_validator
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -62,3 +62,25 @@ class UserRegisterSerailizer(serializers.ModelSerializer):
         user.save()
         return user
 
+
+
+class FarmerImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk farmer import; uniqueness is checked per chunk by accounts.onboarding"""
+    password = serializers.CharField(required=False, allow_blank=True, write_only=True)
+
+    class Meta:
+        model = User
+        fields = ('username', 'email', 'phone', 'password', 'full_name', 'gender', 'district', 'region')
+        extra_kwargs = {
+            'username': {'validators': []},
+            'email': {'validators': []},
+            'phone': {'validators': [phone_validator]},
+        }
+
+    def validate_email(self, value):
+        return value or None
+
+    def validate_password(self, value):
+        if value and len(value) < 6:
+            raise serializers.ValidationError("Password must be at least 6 characters.")
+        return value
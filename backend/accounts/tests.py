@@ -1,3 +1,40 @@
+from django.conf import settings
+from django.core.cache import caches
 from django.test import TestCase
+from portal.cache import RateLimit
+from .models import User
 
-# Create your tests here.
+
+class LoginRateLimitTests(TestCase):
+    url = '/api/accounts/login/'
+
+    def setUp(self):
+        caches['default'].clear()
+        User.objects.create_user(phone='9200000001', full_name='Farmer', email='farmer@example.com', password='secret1')
+
+    def login(self, password, email='farmer@example.com'):
+        return self.client.post(self.url, {'email': email, 'password': password}, content_type='application/json')
+
+    def test_account_limit_counts_only_wrong_passwords(self):
+        capacity = settings.LOGIN_RATE_LIMITS['account'][0]
+        for _ in range(capacity - 1):
+            self.assertEqual(self.login('wrong').status_code, 400)
+        # one short of the limit, correct passwords keep getting in
+        for _ in range(3):
+            self.assertEqual(self.login('secret1').status_code, 200)
+        self.assertEqual(self.login('wrong').status_code, 400)
+        response = self.login('secret1')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # the limit is per account: others can still log in from the same address
+        User.objects.create_user(phone='9200000002', full_name='Other', email='other@example.com', password='secret2')
+        self.assertEqual(self.login('secret2', email='other@example.com').status_code, 200)
+
+    def test_limit_is_kept_in_the_shared_cache(self):
+        # two instances stand in for two workers: only the cache holds the count
+        first, second = RateLimit('test', 2, 60), RateLimit('test', 2, 60)
+        self.assertEqual(first.take('key'), 0)
+        self.assertEqual(second.take('key'), 0)
+        self.assertGreater(first.peek('key'), 0)
+        self.assertGreater(second.take('key'), 0)
+        self.assertEqual(first.take('other'), 0)
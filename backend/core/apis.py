@@ -1,31 +1,168 @@
-
+import asyncio
+import logging
 import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
 from django.http import JsonResponse
-    
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from portal.models import DeviceJob
+
+logger = logging.getLogger(__name__)
+
+# Jobs waiting for or running on the device pool; past DEVICE_JOB_QUEUE new
+# ones are turned away with a 503 instead of piling up in the executor.
+_executor = None
+_slots = threading.BoundedSemaphore(settings.DEVICE_JOB_QUEUE)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.DEVICE_MAX_WORKERS, thread_name_prefix='device')
+    return _executor
+
+
 def generate_random_boolean():
     return random.choice([True, False])
 
-def generate_response(success, message):
-    return JsonResponse({
-        "success": success,
-        "message": message
-    })
 
-def openEmptySlot(request):
+def open_empty_slot():
     random_boolean = generate_random_boolean()
-    print(random_boolean) 
+    logger.debug("Open empty slot succeeded: %s", random_boolean)
     time.sleep(5)
     if random_boolean:
-        return generate_response(True, "Slot opened Successfully")
+        return True, "Slot opened Successfully"
     else:
-        return generate_response(False, "Some error occurred")
+        return False, "Some error occurred"
 
-def getchargedbattery(request):
+def get_charged_battery():
     random_boolean = generate_random_boolean()
-    print(random_boolean) 
+    logger.debug("Get charged battery succeeded: %s", random_boolean)
     time.sleep(5)
     if random_boolean:
-        return generate_response(True, "Take your charged battery")
+        return True, "Take your charged battery"
     else:
-        return generate_response(False, "Some error occurred")
+        return False, "Some error occurred"
+
+
+DEVICE_ACTIONS = {
+    DeviceJob.OPEN_EMPTY_SLOT: open_empty_slot,
+    DeviceJob.GET_CHARGED_BATTERY: get_charged_battery,
+}
+
+
+def expiry():
+    """Jobs created before this and still unfinished are reported failed."""
+    return timezone.now() - timedelta(seconds=settings.DEVICE_JOB_TIMEOUT)
+
+
+def run_job(job_id, action):
+    try:
+        # only a job nobody has been told failed is started; the conditional
+        # UPDATE makes that check and the claim one step
+        claimed = DeviceJob.objects.filter(pk=job_id, status=DeviceJob.PENDING, created_on__gte=expiry()).update(
+            status=DeviceJob.RUNNING,
+        )
+        if not claimed:
+            logger.warning("Device job %s (%s) expired before it started", job_id, action)
+            return
+        try:
+            success, message = DEVICE_ACTIONS[action]()
+            status = DeviceJob.DONE
+        except Exception:
+            logger.exception("Device job %s (%s) failed", job_id, action)
+            success, message, status = False, "Some error occurred", DeviceJob.FAILED
+        DeviceJob.objects.filter(pk=job_id, status=DeviceJob.RUNNING).update(
+            status=status, success=success, message=message, finished_on=timezone.now(),
+        )
+    finally:
+        connections.close_all()
+
+
+def start_job(action):
+    """Queue the device call and answer at once with where to follow it."""
+    if not _slots.acquire(blocking=False):
+        response = JsonResponse({"msg": "Too many device requests in progress. Please try again shortly."}, status=503)
+        response['Retry-After'] = '5'
+        return response
+    try:
+        job = DeviceJob.objects.create(action=action)
+        future = get_executor().submit(run_job, job.pk, action)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return JsonResponse(job_data(job), status=202)
+
+
+def expire(job):
+    """Mark the job failed if it has run out of time (the worker that owned it is gone)."""
+    if job.finished or job.created_on >= expiry():
+        return job
+    DeviceJob.objects.filter(pk=job.pk, status__in=[DeviceJob.PENDING, DeviceJob.RUNNING]).update(
+        status=DeviceJob.FAILED, success=False, message="Device did not respond", finished_on=timezone.now(),
+    )
+    job.refresh_from_db()
+    return job
+
+
+def job_data(job):
+    return {
+        "job_id": str(job.pk),
+        "action": job.action,
+        "status": job.status,
+        "success": job.success,
+        "message": job.message,
+        "url": f"/api/device-jobs/{job.pk}/",
+    }
+
+
+@require_POST
+def openEmptySlot(request):
+    return start_job(DeviceJob.OPEN_EMPTY_SLOT)
+
+@require_POST
+def getchargedbattery(request):
+    return start_job(DeviceJob.GET_CHARGED_BATTERY)
+
+
+def max_wait(request):
+    """
+    Longest ?wait= honoured: under WSGI the async view still runs on a
+    worker thread for the whole wait, so it gets the (much lower) WSGI cap.
+    """
+    if isinstance(request, ASGIRequest):
+        return settings.DEVICE_JOB_MAX_WAIT
+    return settings.DEVICE_JOB_WSGI_MAX_WAIT
+
+
+async def device_job(request, id):
+    """
+    State of a device job. With ?wait=<seconds> the answer is held until the
+    job finishes or the wait (capped by max_wait()) runs out; the view is
+    async so a waiting client doesn't hold a worker thread under ASGI.
+    """
+    if request.method != 'GET':
+        return JsonResponse({"msg": "Method not allowed"}, status=405)
+    try:
+        wait = max(0.0, min(float(request.GET.get('wait') or 0), max_wait(request)))
+    except ValueError:
+        return JsonResponse({"msg": "wait must be a number of seconds"}, status=400)
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            job = await DeviceJob.objects.aget(pk=id)
+        except DeviceJob.DoesNotExist:
+            return JsonResponse({"msg": "Not Found"}, status=404)
+        job = await sync_to_async(expire)(job)
+        data = job_data(job)
+        if job.finished or time.monotonic() >= deadline:
+            return JsonResponse(data)
+        await asyncio.sleep(settings.DEVICE_JOB_POLL_INTERVAL)
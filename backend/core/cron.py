@@ -4,4 +4,4 @@ class Message(BaseCommand):
     help = 'Prints'
 
     def handle(self, *args, **kwargs):
-        print('Hello, this is a cron job!')
\ No newline at end of file
+        self.stdout.write('Hello, this is a cron job!')
\ No newline at end of file
@@ -0,0 +1,106 @@
+import contextvars
+import json
+import logging
+import queue
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# The request being handled by the current thread or task, set by
+# RequestLogMiddleware so every record logged under it carries its id and route.
+current_request = contextvars.ContextVar('current_request', default=None)
+
+# LogRecord attributes that aren't passed through as `extra` fields
+RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id', 'route'}
+
+
+def new_request_id(request):
+    """The caller's X-Request-ID when it looks sane, a fresh one otherwise."""
+    given = request.headers.get('X-Request-ID', '')
+    if given and len(given) <= 64 and given.isprintable():
+        return given
+    return uuid.uuid4().hex
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'view_class', None)
+    return view_class.__name__ if view_class else match.func.__name__
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the id and route of the request they were logged under."""
+
+    def filter(self, record):
+        request = current_request.get()
+        if request is None:
+            record.request_id = record.route = None
+        else:
+            record.request_id = getattr(request, 'request_id', None)
+            record.route = route_name(request)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record; `extra` fields are added as keys."""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'route': getattr(record, 'route', None),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class QueuedStreamHandler(QueueHandler):
+    """
+    Hands records to a background thread that formats and writes them, so a
+    request never waits on the stream. When the queue is full records are
+    dropped (and counted) rather than blocking the caller.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream)
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Only the message is resolved here, while its arguments are still
+        # current; JSON encoding and tracebacks are left to the listener.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # called by logging.shutdown() at exit: writes out what is still queued
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+        self.target.close()
+        super().close()
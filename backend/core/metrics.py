@@ -0,0 +1,114 @@
+import threading
+from bisect import bisect_left
+from django.http import HttpResponse
+
+# In-process request metrics, rendered in the Prometheus text format.
+# Each worker process keeps its own numbers; Prometheus sums them per target.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = 0.0
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class QueryTimer:
+    """connection.execute_wrapper that counts queries and the time spent in them."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = self.clock()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += self.clock() - start
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, view, method, status, seconds, queries, sql_seconds, size):
+        with self.lock:
+            stats = self.routes.get((view, method))
+            if stats is None:
+                stats = self.routes[(view, method)] = RouteStats()
+            stats.latency.observe(seconds)
+            stats.queries.observe(queries)
+            stats.sql_seconds += sql_seconds
+            stats.response_bytes += size
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def render(self):
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                '# HELP fems_http_requests_total Requests handled, by view, method and status.',
+                '# TYPE fems_http_requests_total counter',
+            ]
+            for (view, method), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'fems_http_requests_total{_labels(view=view, method=method, status=status)} {count}')
+            for name, help_text, attr in (
+                ('fems_http_request_duration_seconds', 'Time spent handling a request.', 'latency'),
+                ('fems_db_queries_per_request', 'SQL queries run while handling a request.', 'queries'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (view, method), stats in routes:
+                    histogram = getattr(stats, attr)
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{_labels(view=view, method=method, le=bound)} {count}')
+                    lines.append(f'{name}_sum{_labels(view=view, method=method)} {histogram.sum}')
+                    lines.append(f'{name}_count{_labels(view=view, method=method)} {histogram.count}')
+            for name, help_text, attr in (
+                ('fems_db_query_duration_seconds_total', 'Time spent in SQL queries.', 'sql_seconds'),
+                ('fems_http_response_size_bytes_total', 'Bytes of response bodies sent.', 'response_bytes'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (view, method), stats in routes:
+                    lines.append(f'{name}{_labels(view=view, method=method)} {getattr(stats, attr)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def metrics_view(request):
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
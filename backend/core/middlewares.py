@@ -1,35 +1,162 @@
 import jwt
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
-from accounts.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from accounts.authentication import aget_user, decode_token, get_user
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
+from .logs import current_request, new_request_id, route_name
+from .metrics import registry, QueryTimer
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger('core.access')
+
+
+class RequestLogMiddleware:
+    """
+    Gives each request an id (the caller's X-Request-ID or a new one), makes
+    it current for everything logged while it is handled, echoes it in the
+    response and writes one access record with status and timing.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        token = self.begin(request)
+        try:
+            response = self.get_response(request)
+            self.finish(request, response, start)
+        finally:
+            current_request.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        token = self.begin(request)
+        try:
+            response = await self.get_response(request)
+            self.finish(request, response, start)
+        finally:
+            current_request.reset(token)
+        return response
+
+    def begin(self, request):
+        request.request_id = new_request_id(request)
+        return current_request.set(request)
+
+    def finish(self, request, response, start):
+        response['X-Request-ID'] = request.request_id
+        if access_logger.isEnabledFor(logging.INFO):
+            access_logger.info(
+                "%s %s %s", request.method, request.path, response.status_code,
+                extra={'status': response.status_code, 'duration_ms': round((time.perf_counter() - start) * 1000, 2)},
+            )
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL query count/time, response size and status per view and method.
+    Queries of async views run on worker threads the wrapper can't see, so
+    only their latency, size and status are recorded.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer(time.perf_counter)
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, timer)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, QueryTimer(time.perf_counter))
+        return response
+
+    def record(self, request, response, elapsed, timer):
+        size = 0 if response.streaming else len(response.content)
+        registry.record(route_name(request), request.method, response.status_code, elapsed, timer.count, timer.seconds, size)
 
 
 class AuthMiddleware:
+    async_capable = True
+    sync_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def requires_token(self, request):
+        return request.path.startswith("/api") and 'media' not in request.path and 'upload' not in request.path and 'login' not in request.path  and 'register' not in request.path and 'get-charged-battery' not in request.path and 'open-empty-slot' not in request.path and 'device-jobs' not in request.path and 'verify-otp' not in request.path and 'maharashtra-data' not in request.path and '_metrics' not in request.path
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user_id, error = self.read_token(request)
+        if user_id is not None:
+            error = self.login(request, get_user(user_id))
+        return error or self.get_response(request)
+
+    async def __acall__(self, request):
+        user_id, error = self.read_token(request)
+        if user_id is not None:
+            error = self.login(request, await aget_user(user_id))
+        return error or await self.get_response(request)
+
+    def read_token(self, request):
+        """(user id, None) for a valid token, (None, error response) otherwise; (None, None) if none is needed."""
+        if not self.requires_token(request):
+            return None, None
         token = request.headers.get("Authorization")
-        print(token)
-        if request.path.startswith("/api") and 'media' not in request.path and 'upload' not in request.path and 'login' not in request.path  and 'register' not in request.path and 'get-charged-battery' not in request.path and 'open-empty-slot' not in request.path and 'verify-otp' not in request.path and 'maharashtra-data' not in request.path:
-            if not token:
-                return JsonResponse(
-                    data={"msg": "Token not provided"}, status=403
-                )
-            try:
-                jwt_data = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
-                request.user = User.objects.get(id=jwt_data.get("user_id"))
-
-                response = self.get_response(request)
-                return response
-            except:
-                return JsonResponse(
-                    data={"msg": "Invalid token"}, status=401
-                )
-        response = self.get_response(request)
-        return response
+        if not token:
+            return None, JsonResponse(
+                data={"msg": "Token not provided"}, status=403
+            )
+        try:
+            return decode_token(token), None
+        except (jwt.InvalidTokenError, ValueError):
+            logger.info("Rejected token for %s %s", request.method, request.path)
+            return None, JsonResponse(
+                data={"msg": "Invalid token"}, status=401
+            )
 
+    def login(self, request, user):
+        """Put the token's user on the request, or return the error response."""
+        if user is None:
+            logger.info("Token of a deleted user for %s %s", request.method, request.path)
+            return JsonResponse(
+                data={"msg": "Invalid token"}, status=401
+            )
+        if not user.is_active:
+            return JsonResponse(
+                data={"msg": "Account is not active"}, status=403
+            )
+        request.user = request.token_user = user
+        return None
 
 
 class DisableCSRFCheck(MiddlewareMixin):
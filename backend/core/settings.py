@@ -74,6 +74,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middlewares.DisableCSRFCheck',
+    'core.middlewares.RequestLogMiddleware',
+    'core.middlewares.MetricsMiddleware',
     'core.middlewares.AuthMiddleware',
 
 ]
@@ -120,6 +122,38 @@ DATABASES = {
 }
 
 
+# Password hashing policy: new and re-entered passwords use PASSWORD_HASHER;
+# hashes made by the others (or with another PBKDF2_ITERATIONS) still verify
+# and are rewritten at the next login. argon2 and bcrypt need argon2-cffi /
+# bcrypt installed.
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='pbkdf2')
+PBKDF2_ITERATIONS = env.int('PBKDF2_ITERATIONS', default=600000)
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'accounts.hashers.PBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+]
+
+# Login: password checks run on LOGIN_HASH_WORKERS threads with at most
+# LOGIN_HASH_QUEUE waiting (503 beyond that), and each client IP / account
+# gets (attempts, per this many seconds) (429 beyond that).
+# ASYNC_LOGIN serves /login/ from the async view, for ASGI deployments.
+# ASYNC_VIEWS does the same for the read-heavy crop, plot and wholesaler
+# endpoints (portal.base.async_view); they then have no ETags, cached pages or
+# exports.
+LOGIN_HASH_WORKERS = env.int('LOGIN_HASH_WORKERS', default=2)
+LOGIN_HASH_QUEUE = 32
+LOGIN_RATE_LIMITS = {
+    'ip': (30, 60),
+    'account': (10, 300),
+}
+ASYNC_LOGIN = env.bool('ASYNC_LOGIN', default=False)
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -167,6 +201,125 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "accounts.User"
 
+# Caches
+# "default" holds list counts and validators, "responses" holds cached list
+# responses (portal.cache). Local memory works out of the box; set
+# RESPONSE_CACHE=file to share entries between workers on one host or
+# RESPONSE_CACHE=redis with REDIS_URL (needs the redis package) for a cluster.
+REDIS_URL = env('REDIS_URL', default='redis://127.0.0.1:6379/1')
+RESPONSE_CACHE = env('RESPONSE_CACHE', default='locmem')
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fems-responses',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'responses'),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    },
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        **RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE],
+        'TIMEOUT': 60 * 5,
+        'OPTIONS': {'MAX_ENTRIES': 5000} if RESPONSE_CACHE != 'redis' else {},
+    },
+}
+RESPONSE_CACHE_ALIAS = 'responses'
+
+# In-process cache of decoded JWTs and their users (AuthMiddleware)
+AUTH_CACHE_TTL = env.int('AUTH_CACHE_TTL', default=300)
+AUTH_CACHE_SIZE = 2048
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'accounts.authentication.MiddlewareUserAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+}
+
+# Per-view request metrics served in Prometheus format at /api/_metrics
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+
+# /api/batch: sub-requests per call, and threads shared by parallel batches
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# Bulk farmer import (accounts.onboarding): rows per transaction and password
+# hashing processes of the onboard_farmers command; uploads to the API take at
+# most ONBOARDING_UPLOAD_MAX_ROWS rows and hash on that many shared threads
+ONBOARDING_CHUNK_SIZE = 500
+ONBOARDING_HASH_WORKERS = env.int('ONBOARDING_HASH_WORKERS', default=os.cpu_count() or 1)
+ONBOARDING_UPLOAD_MAX_ROWS = 200
+ONBOARDING_UPLOAD_HASH_THREADS = 2
+
+# Device endpoints: threads talking to stations, jobs allowed to wait or run
+# at once (503 beyond that), seconds before an unfinished job is marked
+# failed (and no longer started), and the long-poll cap/interval of
+# /api/device-jobs. A long-poll holds a worker thread under WSGI, so there it
+# is capped at DEVICE_JOB_WSGI_MAX_WAIT (0: answer at once, clients re-poll);
+# serve core.asgi with an ASGI server to get the full DEVICE_JOB_MAX_WAIT.
+DEVICE_MAX_WORKERS = 8
+DEVICE_JOB_QUEUE = 32
+DEVICE_JOB_TIMEOUT = 60
+DEVICE_JOB_MAX_WAIT = 25
+DEVICE_JOB_WSGI_MAX_WAIT = env.int('DEVICE_JOB_WSGI_MAX_WAIT', default=0)
+DEVICE_JOB_POLL_INTERVAL = 0.5
+
+# Periodic jobs (portal.jobs), installed into the crontab with
+# `manage.py crontab add`. A run's lock is taken over after JOB_LOCK_TIMEOUT
+# seconds; the overdue task sweep changes that many tasks per transaction.
+CRONJOBS = [
+    ('*/15 * * * *', 'crop.jobs.sweep_overdue_tasks'),
+]
+JOB_LOCK_TIMEOUT = 60 * 30
+OVERDUE_SWEEP_BATCH_SIZE = 500
+
+# Logging
+# Records are written as JSON lines by a background thread (core.logs), so
+# request threads only pay for putting them on a queue. Each one carries the
+# id and route of the request it was logged under.
+LOG_LEVEL = env('LOG_LEVEL', default='INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {'()': 'core.logs.RequestContextFilter'},
+    },
+    'formatters': {
+        'json': {'()': 'core.logs.JSONFormatter'},
+    },
+    'handlers': {
+        'queue': {
+            '()': 'core.logs.QueuedStreamHandler',
+            'stream': 'ext://sys.stdout',
+            'filters': ['request_context'],
+            'formatter': 'json',
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': 'WARNING'},
+    'loggers': {
+        'django': {'level': 'INFO'},
+        'django.db.backends': {'level': 'WARNING'},
+        'core': {'level': LOG_LEVEL},
+        'core.access': {'level': env('ACCESS_LOG_LEVEL', default='INFO')},
+        'accounts': {'level': LOG_LEVEL},
+        'portal': {'level': LOG_LEVEL},
+        'plot': {'level': LOG_LEVEL},
+        'crop': {'level': LOG_LEVEL},
+        'wholeseller': {'level': LOG_LEVEL},
+        'services': {'level': LOG_LEVEL},
+    },
+}
+
 # Email configuration - commented out for development
 # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST_USER = env("EMAIL_HOST_USER")
@@ -0,0 +1,64 @@
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.test import TestCase
+from portal.models import DeviceJob
+from . import apis
+
+
+class DeviceJobTests(TestCase):
+    def job_url(self, job):
+        return f'/api/device-jobs/{job.pk}/'
+
+    def test_start_queues_a_job(self):
+        future = Future()
+        with mock.patch.object(apis, 'get_executor') as get_executor:
+            get_executor.return_value.submit.return_value = future
+            response = self.client.post('/api/open-empty-slot/')
+        self.assertEqual(response.status_code, 202)
+        job = DeviceJob.objects.get()
+        self.assertEqual(response.json()['url'], self.job_url(job))
+        get_executor.return_value.submit.assert_called_once_with(apis.run_job, job.pk, DeviceJob.OPEN_EMPTY_SLOT)
+        future.set_result(None)
+
+    def test_full_queue_is_turned_away(self):
+        with mock.patch.object(apis, '_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = self.client.post('/api/get-charged-battery/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertFalse(DeviceJob.objects.exists())
+
+    def test_state(self):
+        job = DeviceJob.objects.create(action=DeviceJob.OPEN_EMPTY_SLOT)
+        data = self.client.get(self.job_url(job)).json()
+        self.assertEqual((data['job_id'], data['status'], data['success']), (str(job.pk), DeviceJob.PENDING, None))
+        DeviceJob.objects.filter(pk=job.pk).update(status=DeviceJob.DONE, success=True, message='Slot opened Successfully')
+        data = self.client.get(self.job_url(job)).json()
+        self.assertEqual((data['status'], data['success'], data['message']), (DeviceJob.DONE, True, 'Slot opened Successfully'))
+        self.assertEqual(self.client.get('/api/device-jobs/00000000-0000-0000-0000-000000000000/').status_code, 404)
+        self.assertEqual(self.client.get(self.job_url(job) + '?wait=soon').status_code, 400)
+
+    def test_expired_job_fails_and_is_not_started(self):
+        job = DeviceJob.objects.create(action=DeviceJob.OPEN_EMPTY_SLOT)
+        DeviceJob.objects.filter(pk=job.pk).update(
+            created_on=job.created_on - timedelta(seconds=settings.DEVICE_JOB_TIMEOUT + 1),
+        )
+        data = self.client.get(self.job_url(job)).json()
+        self.assertEqual((data['status'], data['message']), (DeviceJob.FAILED, 'Device did not respond'))
+        action = mock.Mock(return_value=(True, ''))
+        with mock.patch.object(apis, 'connections'), mock.patch.dict(apis.DEVICE_ACTIONS, {DeviceJob.OPEN_EMPTY_SLOT: action}):
+            apis.run_job(job.pk, DeviceJob.OPEN_EMPTY_SLOT)
+        action.assert_not_called()
+        self.assertEqual(DeviceJob.objects.get(pk=job.pk).status, DeviceJob.FAILED)
+
+    def test_wait_is_capped_under_wsgi(self):
+        job = DeviceJob.objects.create(action=DeviceJob.OPEN_EMPTY_SLOT)
+        start = time.monotonic()
+        with self.settings(DEVICE_JOB_WSGI_MAX_WAIT=0, DEVICE_JOB_POLL_INTERVAL=0.05):
+            data = self.client.get(self.job_url(job) + '?wait=20').json()
+        self.assertEqual(data['status'], DeviceJob.PENDING)
+        self.assertLess(time.monotonic() - start, 1)
@@ -1,14 +1,19 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from .apis import getchargedbattery, openEmptySlot
+from .apis import device_job, getchargedbattery, openEmptySlot
+from .metrics import metrics_view
+from portal.batch import BatchAPIView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/get-charged-battery/', getchargedbattery),
     path('api/open-empty-slot/', openEmptySlot),
+    path('api/device-jobs/<uuid:id>/', device_job),
+    path('api/_metrics', metrics_view),
+    re_path(r'^api/batch/?$', BatchAPIView.as_view()),
 
     path('api/accounts/', include('accounts.urls')),
     path('api/crop/',include('crop.urls')),
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Crop, Fertilizer, Plot, CropPlot, CropFertilizer, Farmer, CropStock, Machinery, Manpower, FarmTask, Resource, MarketPrice
+from .models import Crop, Fertilizer, Plot, CropPlot, CropFertilizer, Farmer, CropStock, Machinery, Manpower, FarmTask, TaskReminder, Resource, MarketPrice
 
 @admin.register(Crop)
 class CropAdmin(admin.ModelAdmin):
@@ -67,11 +67,17 @@ class ManpowerAdmin(admin.ModelAdmin):
 
 @admin.register(FarmTask)
 class FarmTaskAdmin(admin.ModelAdmin):
-    list_display = ['title', 'task_type', 'priority', 'status', 'farmer', 'due_date']
+    list_display = ['title', 'task_type', 'priority', 'status', 'farmer', 'due_date', 'is_overdue']
     search_fields = ['title', 'farmer__username']
     list_filter = ['task_type', 'priority', 'status', 'due_date']
 
 
+@admin.register(TaskReminder)
+class TaskReminderAdmin(admin.ModelAdmin):
+    list_display = ['message', 'farmer', 'created_on', 'sent_on']
+    search_fields = ['message', 'farmer__username']
+
+
 @admin.register(Resource)
 class ResourceAdmin(admin.ModelAdmin):
     list_display = ['title', 'resource_type', 'category', 'is_featured', 'views_count']
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from portal.bulk import bulk_update_objects, send_save_signals
+from portal.jobs import periodic_job
+from .models import FarmTask, TaskReminder
+
+OPEN = ('PENDING', 'IN_PROGRESS')
+
+
+def flag_in_batches(queryset, overdue, on_batch=None):
+    """
+    Set is_overdue on every row of `queryset` (which must exclude rows already
+    set that way) a batch at a time, each batch in its own transaction; the
+    rows of a batch drop out of the queryset, so it is read from the start
+    again each time. Returns the number of rows changed.
+    """
+    size = settings.OVERDUE_SWEEP_BATCH_SIZE
+    queryset = queryset.order_by()
+    changed = 0
+    while True:
+        with transaction.atomic():
+            tasks = list(queryset.select_for_update()[:size])
+            if not tasks:
+                return changed
+            for task in tasks:
+                task.is_overdue = overdue
+            bulk_update_objects(FarmTask, tasks, ['is_overdue'])
+            if on_batch:
+                on_batch(tasks)
+        changed += len(tasks)
+
+
+def queue_reminders(tasks):
+    reminders = [
+        TaskReminder(task=task, farmer_id=task.farmer_id, message=f'"{task.title}" was due on {task.due_date:%d %b %Y}')
+        for task in tasks if not task.is_deleted
+    ]
+    send_save_signals(TaskReminder, reminders, True, when='pre')
+    TaskReminder.objects.bulk_create(reminders)
+    send_save_signals(TaskReminder, reminders, True)
+
+
+@periodic_job('sweep-overdue-tasks')
+def sweep_overdue_tasks():
+    """
+    Flag open tasks whose due date has passed, queueing a reminder for each,
+    and clear the flag from tasks that were finished or moved since. Every
+    lookup is by status and a due_date range, served by the (status,
+    due_date) index.
+    """
+    today = timezone.localdate()
+    changed = 0
+    for status, label in FarmTask.STATUS_CHOICES:
+        tasks = FarmTask.objects.filter(status=status)
+        if status in OPEN:
+            changed += flag_in_batches(tasks.filter(due_date__lt=today, is_overdue=False), True, queue_reminders)
+            changed += flag_in_batches(tasks.filter(due_date__gte=today, is_overdue=True), False)
+            changed += flag_in_batches(tasks.filter(due_date__isnull=True, is_overdue=True), False)
+        else:
+            changed += flag_in_batches(tasks.filter(is_overdue=True), False)
+    return changed
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from crop.stock_totals import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute CropStockTotals from the CropStock rows, for every farmer or the given user ids'
+
+    def add_arguments(self, parser):
+        parser.add_argument('farmers', nargs='*', help='user id of a farmer')
+
+    def handle(self, *args, **options):
+        written = rebuild(options['farmers'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} stock totals'))
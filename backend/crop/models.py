@@ -1,9 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from accounts.models import User
 import uuid
 from portal.base import BaseModel
 
 class Crop(BaseModel):
+    search_fields = ('name', 'variety', 'description')
+
     name = models.CharField(max_length=128)
     variety = models.CharField(max_length=128, blank=True)
     season = models.CharField(max_length=50, choices=[
@@ -34,6 +36,8 @@ class Fertilizer(BaseModel):
 
 
 class Plot(BaseModel):
+    search_fields = ('name', 'village', 'survey_number', 'ownership')
+
     name = models.CharField(max_length=128)
     area = models.FloatField(help_text="Area in acres or hectares")
     soil_type = models.CharField(max_length=50, blank=True, choices=[
@@ -50,7 +54,12 @@ class Plot(BaseModel):
     altitude = models.FloatField(blank=True, null=True)
     village = models.CharField(max_length=128, blank=True, null=True)
     ownership = models.CharField(max_length=128, blank=True, null=True)
-    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='plots')
+    # Owner-scoped models index (farmer, created_on) instead of the bare FK:
+    # it serves the per-farmer pages newest first and the farmer lookups alike.
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='plots', db_index=False)
+
+    class Meta(BaseModel.Meta):
+        indexes = [models.Index(fields=['farmer', 'created_on'])]
 
     def __str__(self):
         return f'{self.name} ({self.area} acres)'
@@ -68,6 +77,11 @@ class CropPlot(BaseModel):
 
     class Meta:
         unique_together = ('crop', 'plot')  
+        # date range scans for the harvest calendar
+        indexes = [
+            models.Index(fields=['expected_harvest_date']),
+            models.Index(fields=['planting_date']),
+        ]
 
     def __str__(self):
         return f'{self.crop.name} on {self.plot.name}'
@@ -96,22 +110,49 @@ class Farmer(BaseModel):
 class CropStock(BaseModel):
     """Track crop stock/inventory"""
     crop = models.ForeignKey(Crop, on_delete=models.CASCADE, related_name='stocks')
-    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='crop_stocks')
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='crop_stocks', db_index=False)
     quantity_on_hold = models.FloatField(default=0, help_text="Quantity in kg")
     sold_quantity = models.FloatField(default=0, help_text="Quantity in kg")
     expected_harvest_date = models.DateField(null=True, blank=True)
     expected_selling_date = models.DateField(null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [models.Index(fields=['farmer', 'created_on'])]
+
     def __str__(self):
         return f'{self.crop.name} - {self.quantity_on_hold} kg'
 
+    def save(self, *args, **kwargs):
+        # crop.signals locks the old row and moves CropStockTotals inside
+        # this transaction, so the row and its totals change together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class CropStockTotals(models.Model):
+    """Sum of a farmer's live CropStock rows per crop, kept current by crop.signals"""
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='crop_stock_totals')
+    crop = models.ForeignKey(Crop, on_delete=models.CASCADE, related_name='stock_totals')
+    quantity_on_hold = models.FloatField(default=0, help_text="Quantity in kg")
+    sold_quantity = models.FloatField(default=0, help_text="Quantity in kg")
+    entries = models.IntegerField(default=0, help_text="CropStock rows summed")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['farmer', 'crop'], name='unique_crop_stock_totals')]
+
+    def __str__(self):
+        return f'{self.crop_id} - {self.quantity_on_hold} kg'
+
 
 class Machinery(BaseModel):
     """Track farm machinery"""
     name = models.CharField(max_length=128)
     description = models.TextField(blank=True, null=True)
     total_number = models.IntegerField(default=1)
-    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='machinery', null=True, blank=True)
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='machinery', null=True, blank=True, db_index=False)
+
+    class Meta(BaseModel.Meta):
+        indexes = [models.Index(fields=['farmer', 'created_on'])]
 
     def __str__(self):
         return f'{self.name} ({self.total_number})'
@@ -127,7 +168,10 @@ class Manpower(BaseModel):
         ('SUPERVISOR', 'Supervisor'),
     ], default='WORKER')
     description = models.TextField(blank=True, null=True)
-    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='workers', null=True, blank=True)
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='workers', null=True, blank=True, db_index=False)
+
+    class Meta(BaseModel.Meta):
+        indexes = [models.Index(fields=['farmer', 'created_on'])]
 
     def __str__(self):
         return f'{self.name} ({self.position})'
@@ -166,26 +210,80 @@ class FarmTask(BaseModel):
     priority = models.CharField(max_length=10, choices=PRIORITY_LEVELS, default='MEDIUM')
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='PENDING')
     
-    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks', db_index=False)
     plot = models.ForeignKey(Plot, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks')
     crop = models.ForeignKey(Crop, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks')
     
-    due_date = models.DateField(null=True, blank=True)
+    due_date = models.DateField(null=True, blank=True, db_index=True)
     completed_date = models.DateField(null=True, blank=True)
     estimated_hours = models.FloatField(default=0, help_text="Estimated time in hours")
     actual_hours = models.FloatField(default=0, help_text="Actual time spent in hours")
     cost = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     notes = models.TextField(blank=True, null=True)
+    is_overdue = models.BooleanField(default=False, help_text="Set by the overdue task sweep (crop.jobs)")
 
     class Meta:
         ordering = ['-created_on']
+        indexes = [
+            models.Index(fields=['status', 'due_date']),
+            models.Index(fields=['farmer', 'created_on']),
+        ]
 
     def __str__(self):
         return f'{self.title} ({self.task_type}) - {self.status}'
 
+    def save(self, *args, **kwargs):
+        # crop.signals locks the old row and moves FarmTaskRollup inside this
+        # transaction, so the task and its rollup change together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class FarmTaskRollup(models.Model):
+    """
+    Sums over a farmer's live FarmTask rows per plot, crop, task type and
+    month (of the due date, else of creation), kept current by crop.signals
+    """
+    key = models.CharField(max_length=160, unique=True, help_text="farmer:plot:crop:task_type:month")
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_rollups', db_index=False)
+    # SET_NULL like FarmTask's, crop.task_rollups.fold_deleted() then merges the rows
+    plot = models.ForeignKey(Plot, on_delete=models.SET_NULL, null=True, blank=True, related_name='task_rollups')
+    crop = models.ForeignKey(Crop, on_delete=models.SET_NULL, null=True, blank=True, related_name='task_rollups')
+    task_type = models.CharField(max_length=20, choices=FarmTask.TASK_TYPES)
+    month = models.DateField(help_text="First day of the month")
+    tasks = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    estimated_hours = models.FloatField(default=0)
+    actual_hours = models.FloatField(default=0)
+    completed_estimated_hours = models.FloatField(default=0, help_text="Estimated hours of the completed tasks")
+    completed_actual_hours = models.FloatField(default=0, help_text="Actual hours of the completed tasks")
+
+    class Meta:
+        indexes = [models.Index(fields=['farmer', 'month'])]
+
+    def __str__(self):
+        return self.key
+
+
+class TaskReminder(BaseModel):
+    """A reminder about a task waiting to be sent to its farmer"""
+    task = models.ForeignKey(FarmTask, on_delete=models.CASCADE, related_name='reminders')
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_reminders', db_index=False)
+    message = models.CharField(max_length=255)
+    sent_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta(BaseModel.Meta):
+        indexes = [models.Index(fields=['farmer', 'created_on'])]
+
+    def __str__(self):
+        return self.message
+
 
 class Resource(BaseModel):
     """Resource Library for articles, guides, and farming resources"""
+    search_fields = ('title', 'description', 'content', 'tags', 'author')
+
     RESOURCE_TYPES = [
         ('ARTICLE', 'Article'),
         ('GUIDE', 'Guide'),
@@ -236,7 +334,7 @@ class MarketPrice(BaseModel):
     market_name = models.CharField(max_length=128)
     location = models.CharField(max_length=255, blank=True, null=True)
     price_per_kg = models.DecimalField(max_digits=10, decimal_places=2)
-    price_date = models.DateField()
+    price_date = models.DateField(db_index=True)
     
     min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Crop, Fertilizer, Plot, CropPlot, CropFertilizer, Farmer, CropStock, Machinery, Manpower, FarmTask, Resource, MarketPrice
+from .models import Crop, Fertilizer, Plot, CropPlot, CropFertilizer, Farmer, CropStock, Machinery, Manpower, FarmTask, TaskReminder, Resource, MarketPrice
 
 class CropGETSerializer(serializers.ModelSerializer):
     class Meta:
@@ -136,6 +136,20 @@ class FarmTaskPOSTSerializer(serializers.ModelSerializer):
     class Meta:
         model = FarmTask
         fields = '__all__'
+        read_only_fields = ('is_overdue',)
+
+
+class TaskReminderGETSerializer(serializers.ModelSerializer):
+    task_title = serializers.CharField(source='task.title', read_only=True)
+
+    class Meta:
+        model = TaskReminder
+        fields = '__all__'
+
+class TaskReminderPOSTSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskReminder
+        fields = '__all__'
 
 
 # Resource Serializers
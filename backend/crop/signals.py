@@ -0,0 +1,66 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from . import stock_totals, task_rollups
+from .models import Crop, CropStock, FarmTask, Plot
+
+
+@receiver(pre_save, sender=CropStock)
+def remember_stock(sender, instance, **kwargs):
+    # what the row contributed before this save, read from the database since
+    # the instance may already carry the new values; CropStock.save() runs in
+    # a transaction, so the row stays locked until its totals are moved
+    instance._stock_before = None
+    if not instance._state.adding:
+        instance._stock_before = stock_totals.stored_contribution(instance.pk)
+
+
+@receiver(post_save, sender=CropStock)
+def update_stock_totals(sender, instance, created, **kwargs):
+    stock_totals.move(None if created else getattr(instance, '_stock_before', None), stock_totals.contribution(instance))
+
+
+@receiver(pre_delete, sender=CropStock)
+def remember_deleted_stock(sender, instance, **kwargs):
+    # deletes run in a transaction: lock the row and take what it holds now,
+    # not what this possibly stale instance says
+    instance._stock_before = stock_totals.stored_contribution(instance.pk)
+
+
+@receiver(post_delete, sender=CropStock)
+def remove_stock_totals(sender, instance, **kwargs):
+    before = getattr(instance, '_stock_before', None)
+    stock_totals.move(before or stock_totals.contribution(instance), None)
+
+
+@receiver(pre_save, sender=FarmTask)
+def remember_task(sender, instance, update_fields=None, **kwargs):
+    instance._task_before = None
+    if not instance._state.adding and task_rollups.affects_rollups(update_fields):
+        instance._task_before = task_rollups.stored_contribution(instance.pk)
+
+
+@receiver(post_save, sender=FarmTask)
+def update_task_rollups(sender, instance, created, update_fields=None, **kwargs):
+    if task_rollups.affects_rollups(update_fields):
+        task_rollups.move(None if created else getattr(instance, '_task_before', None), task_rollups.contribution(instance))
+
+
+@receiver(pre_delete, sender=FarmTask)
+def remember_deleted_task(sender, instance, **kwargs):
+    instance._task_before = task_rollups.stored_contribution(instance.pk)
+
+
+@receiver(post_delete, sender=FarmTask)
+def remove_task_rollups(sender, instance, **kwargs):
+    before = getattr(instance, '_task_before', None)
+    task_rollups.move(before or task_rollups.contribution(instance), None)
+
+
+@receiver(post_delete, sender=Plot)
+def fold_plot_rollups(sender, instance, **kwargs):
+    task_rollups.fold_deleted('plot', instance.pk, f'{instance.farmer_id}:{instance.pk}:')
+
+
+@receiver(post_delete, sender=Crop)
+def fold_crop_rollups(sender, instance, **kwargs):
+    task_rollups.fold_deleted('crop', instance.pk)
@@ -0,0 +1,94 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from .models import CropStock, CropStockTotals
+
+# CropStockTotals holds, per (farmer, crop), the sums over the live
+# (is_deleted=False) CropStock rows. Every save or delete of a stock row locks
+# the stored row, reads what it contributed and moves the totals by the
+# difference with an UPDATE ... SET col = col + x, all in the transaction of
+# the write, so concurrent writers neither lose updates nor both subtract the
+# same old values.
+# QuerySet.update()/delete() on CropStock bypass this: run rebuild_stock_totals
+# after those.
+
+
+def contribution(stock):
+    """(farmer, crop, on hold, sold, entries) a stock row adds to the totals."""
+    if stock.is_deleted:
+        return stock.farmer_id, stock.crop_id, 0, 0, 0
+    return stock.farmer_id, stock.crop_id, stock.quantity_on_hold or 0, stock.sold_quantity or 0, 1
+
+
+def stored_contribution(pk):
+    """contribution() of the row as stored, locked for the rest of the transaction; None if it's gone."""
+    old = CropStock.objects.select_for_update().filter(pk=pk).values(
+        'farmer_id', 'crop_id', 'quantity_on_hold', 'sold_quantity', 'is_deleted',
+    ).first()
+    if old is None:
+        return None
+    return contribution(CropStock(
+        farmer_id=old['farmer_id'], crop_id=old['crop_id'], is_deleted=old['is_deleted'],
+        quantity_on_hold=old['quantity_on_hold'], sold_quantity=old['sold_quantity'],
+    ))
+
+
+def apply(farmer_id, crop_id, on_hold, sold, entries):
+    if not (on_hold or sold or entries):
+        return
+    changes = dict(
+        quantity_on_hold=F('quantity_on_hold') + on_hold,
+        sold_quantity=F('sold_quantity') + sold,
+        entries=F('entries') + entries,
+    )
+    totals = CropStockTotals.objects.filter(farmer_id=farmer_id, crop_id=crop_id)
+    if totals.update(**changes):
+        return
+    if entries < 0:
+        # removing a row whose totals are already gone: the farmer or crop is
+        # being deleted along with them
+        return
+    try:
+        with transaction.atomic():
+            CropStockTotals.objects.create(
+                farmer_id=farmer_id, crop_id=crop_id, quantity_on_hold=on_hold, sold_quantity=sold, entries=entries,
+            )
+    except IntegrityError:
+        # created by a concurrent write since the UPDATE above
+        totals.update(**changes)
+
+
+def move(before, after):
+    """Apply the change from one contribution to another (either may be None)."""
+    if before and after and before[:2] == after[:2]:
+        apply(*after[:2], *(new - old for new, old in zip(after[2:], before[2:])))
+        return
+    if before:
+        apply(*before[:2], *(-value for value in before[2:]))
+    if after:
+        apply(*after)
+
+
+def rebuild(farmer_ids=None):
+    """Recompute the totals from the stock table; returns the number of rows written."""
+    stocks = CropStock.objects.all()
+    totals = CropStockTotals.objects.all()
+    if farmer_ids is not None:
+        stocks = stocks.filter(farmer_id__in=farmer_ids)
+        totals = totals.filter(farmer_id__in=farmer_ids)
+    live = Q(is_deleted=False)
+    sums = stocks.order_by().values('farmer_id', 'crop_id').annotate(
+        on_hold=Sum('quantity_on_hold', filter=live),
+        sold=Sum('sold_quantity', filter=live),
+        entries=Count('id', filter=live),
+    ).filter(entries__gt=0)
+    rows = [
+        CropStockTotals(
+            farmer_id=row['farmer_id'], crop_id=row['crop_id'],
+            quantity_on_hold=row['on_hold'] or 0, sold_quantity=row['sold'] or 0, entries=row['entries'],
+        )
+        for row in sums
+    ]
+    with transaction.atomic():
+        totals.delete()
+        CropStockTotals.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
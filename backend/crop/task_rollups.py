@@ -0,0 +1,144 @@
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+from .models import FarmTask, FarmTaskRollup
+
+# FarmTaskRollup holds, per (farmer, plot, crop, task type, month), the sums
+# over the live FarmTask rows, maintained like crop.stock_totals: every save
+# or delete of a task locks the stored task and moves its rollup row by the
+# difference with an UPDATE ... SET col = col + x in the same transaction as
+# the write. Deleting a plot or crop nulls it on the tasks and their rollup
+# rows alike; fold_deleted() then merges those rows into the ones without a
+# plot/crop. QuerySet.update()/delete() on FarmTask bypass all this: run
+# rebuild_task_rollups after those.
+
+# the task fields a contribution is computed from
+FIELDS = ('farmer', 'plot', 'crop', 'task_type', 'due_date', 'created_on', 'status', 'cost', 'estimated_hours', 'actual_hours', 'is_deleted')
+MEASURES = ('tasks', 'completed', 'cost', 'estimated_hours', 'actual_hours', 'completed_estimated_hours', 'completed_actual_hours')
+
+
+def affects_rollups(update_fields):
+    """False for a save limited to fields the rollups don't depend on (e.g. the overdue sweep's)."""
+    return update_fields is None or any(name.removesuffix('_id') in FIELDS for name in update_fields)
+
+
+def value(task, name):
+    """
+    The task's `name` as the field stores it: create(due_date='2024-01-01')
+    and friends leave the raw value on the instance.
+    """
+    field = FarmTask._meta.get_field(name)
+    if field.is_relation:
+        return field.target_field.to_python(getattr(task, field.attname))
+    return field.to_python(getattr(task, name))
+
+
+def task_month(task):
+    day = value(task, 'due_date') or timezone.localdate(task.created_on)
+    return day.replace(day=1)
+
+
+def contribution(task):
+    """(rollup key fields, measures) a task adds to the rollups, None when it adds nothing."""
+    if task.is_deleted:
+        return None
+    done = task.status == 'COMPLETED'
+    estimated, actual = value(task, 'estimated_hours') or 0, value(task, 'actual_hours') or 0
+    keys = (value(task, 'farmer'), value(task, 'plot'), value(task, 'crop'), task.task_type, task_month(task))
+    return keys, (1, int(done), value(task, 'cost') or Decimal(0), estimated, actual, estimated if done else 0, actual if done else 0)
+
+
+def rollup_key(farmer_id, plot_id, crop_id, task_type, month):
+    return f'{farmer_id}:{plot_id or "-"}:{crop_id or "-"}:{task_type}:{month:%Y-%m}'
+
+
+def stored_contribution(pk):
+    """contribution() of the task as stored, locked for the rest of the transaction; None if it's gone."""
+    task = FarmTask.objects.select_for_update().filter(pk=pk).only(*FIELDS).first()
+    return contribution(task) if task is not None else None
+
+
+def apply(keys, values):
+    if not any(values):
+        return
+    changes = {name: F(name) + value for name, value in zip(MEASURES, values)}
+    key = rollup_key(*keys)
+    rollup = FarmTaskRollup.objects.filter(key=key)
+    if rollup.update(**changes):
+        return
+    if values[0] < 0:
+        # removing a task whose rollup is already gone: the farmer is being
+        # deleted along with it
+        return
+    farmer_id, plot_id, crop_id, task_type, month = keys
+    try:
+        with transaction.atomic():
+            FarmTaskRollup.objects.create(
+                key=key, farmer_id=farmer_id, plot_id=plot_id, crop_id=crop_id, task_type=task_type, month=month,
+                **dict(zip(MEASURES, values)),
+            )
+    except IntegrityError:
+        # created by a concurrent write since the UPDATE above
+        rollup.update(**changes)
+
+
+def move(before, after):
+    """Apply the change from one contribution to another (either may be None)."""
+    if before and after and before[0] == after[0]:
+        apply(after[0], [new - old for new, old in zip(after[1], before[1])])
+        return
+    if before:
+        apply(before[0], [-value for value in before[1]])
+    if after:
+        apply(*after)
+
+
+def fold_deleted(field, pk, key_prefix=''):
+    """
+    Merge the rollup rows that lost their plot or crop (`field`) `pk` to its
+    deletion into the rows keyed without it, where the tasks now count.
+    """
+    orphans = FarmTaskRollup.objects.select_for_update().filter(
+        **{f'{field}__isnull': True}, key__startswith=key_prefix, key__contains=f':{pk}:',
+    )
+    for row in orphans:
+        FarmTaskRollup.objects.filter(pk=row.pk).delete()
+        apply(
+            (row.farmer_id, row.plot_id, row.crop_id, row.task_type, row.month),
+            [getattr(row, name) for name in MEASURES],
+        )
+
+
+def rebuild(farmer_ids=None):
+    """Recompute the rollups from the task table; returns the number of rows written."""
+    tasks = FarmTask.objects.filter(is_deleted=False)
+    rollups = FarmTaskRollup.objects.all()
+    if farmer_ids is not None:
+        tasks = tasks.filter(farmer_id__in=farmer_ids)
+        rollups = rollups.filter(farmer_id__in=farmer_ids)
+    done = Q(status='COMPLETED')
+    sums = tasks.order_by().annotate(
+        month=TruncMonth(Coalesce('due_date', TruncDate('created_on'))),
+    ).values('farmer_id', 'plot_id', 'crop_id', 'task_type', 'month').annotate(
+        # prefixed, annotations can't reuse the task's field names
+        sum_tasks=Count('id'),
+        sum_completed=Count('id', filter=done),
+        sum_cost=Sum('cost'),
+        sum_estimated_hours=Sum('estimated_hours'),
+        sum_actual_hours=Sum('actual_hours'),
+        sum_completed_estimated_hours=Sum('estimated_hours', filter=done),
+        sum_completed_actual_hours=Sum('actual_hours', filter=done),
+    )
+    rows = []
+    for row in sums:
+        keys = (row['farmer_id'], row['plot_id'], row['crop_id'], row['task_type'], row['month'])
+        rows.append(FarmTaskRollup(
+            key=rollup_key(*keys), farmer_id=keys[0], plot_id=keys[1], crop_id=keys[2], task_type=keys[3], month=keys[4],
+            **{name: row[f'sum_{name}'] or 0 for name in MEASURES},
+        ))
+    with transaction.atomic():
+        rollups.delete()
+        FarmTaskRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -1,3 +1,239 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+import jwt
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
 from django.test import TestCase
+from django.utils import timezone
+from accounts.models import User
+from portal.pagination import CURSOR_ORDERING
+from wholeseller.models import Transaction, Wholesaler
+from .models import (
+    Crop, CropPlot, CropStock, CropStockTotals, Farmer, FarmTask, FarmTaskRollup, Machinery, Manpower, Plot,
+    TaskReminder,
+)
 
-# Create your tests here.
+
+def make_user(phone):
+    return User.objects.create_user(phone=phone, full_name=f'Farmer {phone}', email=f'{phone}@example.com')
+
+
+class CropStockTotalsTests(TestCase):
+    def setUp(self):
+        self.farmer = make_user('9000000001')
+        self.wheat = Crop.objects.create(name='Wheat')
+        self.rice = Crop.objects.create(name='Rice')
+
+    def totals(self):
+        return {
+            (row.farmer_id, row.crop.name): (row.quantity_on_hold, row.sold_quantity, row.entries)
+            for row in CropStockTotals.objects.select_related('crop') if row.entries
+        }
+
+    def rebuilt(self):
+        call_command('rebuild_stock_totals', stdout=StringIO())
+        return self.totals()
+
+    def test_create_adds_to_totals(self):
+        CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=10, sold_quantity=2)
+        CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=5)
+        self.assertEqual(self.totals(), {(self.farmer.pk, 'Wheat'): (15, 2, 2)})
+
+    def test_update_moves_the_difference(self):
+        stock = CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=10)
+        stock.quantity_on_hold = 25
+        stock.sold_quantity = 4
+        stock.save()
+        self.assertEqual(self.totals(), {(self.farmer.pk, 'Wheat'): (25, 4, 1)})
+        self.assertEqual(self.totals(), self.rebuilt())
+
+    def test_update_uses_stored_values_not_a_stale_instance(self):
+        stock = CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=10)
+        stale = CropStock.objects.get(pk=stock.pk)
+        stock.quantity_on_hold = 20
+        stock.save()
+        stale.sold_quantity = 3
+        stale.save()
+        self.assertEqual(self.totals(), {(self.farmer.pk, 'Wheat'): (10, 3, 1)})
+        self.assertEqual(self.totals(), self.rebuilt())
+
+    def test_changing_crop_moves_between_rows(self):
+        stock = CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=10)
+        stock.crop = self.rice
+        stock.save()
+        self.assertEqual(self.totals(), {(self.farmer.pk, 'Rice'): (10, 0, 1)})
+
+    def test_soft_and_hard_delete_remove_the_row(self):
+        kept = CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=1)
+        soft = CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=10)
+        hard = CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=100)
+        soft.is_deleted = True
+        soft.save()
+        CropStock.objects.get(pk=hard.pk).delete()
+        self.assertEqual(self.totals(), {(self.farmer.pk, 'Wheat'): (1, 0, 1)})
+        self.assertEqual(self.totals(), self.rebuilt())
+
+    def test_deleting_the_crop_or_farmer_drops_their_totals(self):
+        other = make_user('9000000002')
+        for farmer in (self.farmer, other):
+            CropStock.objects.create(crop=self.wheat, farmer=farmer, quantity_on_hold=10)
+            CropStock.objects.create(crop=self.rice, farmer=farmer, quantity_on_hold=3)
+        self.wheat.delete()
+        other.delete()
+        self.assertEqual(self.totals(), {(self.farmer.pk, 'Rice'): (3, 0, 1)})
+        self.assertEqual(self.totals(), self.rebuilt())
+
+
+class FarmTaskRollupTests(TestCase):
+    def setUp(self):
+        self.farmer = make_user('9000000011')
+        self.plot = Plot.objects.create(name='North', area=2, farmer=self.farmer)
+        self.wheat = Crop.objects.create(name='Wheat')
+
+    def task(self, **fields):
+        fields = {'title': 'Weeding', 'farmer': self.farmer, 'plot': self.plot, 'crop': self.wheat, **fields}
+        return FarmTask.objects.create(**fields)
+
+    def rollups(self):
+        return {
+            row.key.split(':', 1)[1]: (row.tasks, row.completed, row.cost)
+            for row in FarmTaskRollup.objects.all() if row.tasks
+        }
+
+    def rebuilt(self):
+        call_command('rebuild_task_rollups', stdout=StringIO())
+        return self.rollups()
+
+    def key(self, plot=True, crop=True, task_type='OTHER'):
+        month = FarmTaskRollup.objects.values_list('month', flat=True).first()
+        return f'{self.plot.pk if plot else "-"}:{self.wheat.pk if crop else "-"}:{task_type}:{month:%Y-%m}'
+
+    def test_create_adds_to_rollup(self):
+        self.task(cost=5)
+        self.task(cost=2, status='COMPLETED')
+        self.assertEqual(self.rollups(), {self.key(): (2, 1, 7)})
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_update_moves_the_difference(self):
+        task = self.task(cost=5)
+        task.cost = 8
+        task.status = 'COMPLETED'
+        task.save()
+        self.assertEqual(self.rollups(), {self.key(): (1, 1, 8)})
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_changing_type_or_plot_moves_between_rows(self):
+        task = self.task(cost=5)
+        self.task(cost=1)
+        task.task_type = 'HARVESTING'
+        task.plot = None
+        task.save()
+        self.assertEqual(self.rollups(), {self.key(): (1, 0, 1), self.key(plot=False, task_type='HARVESTING'): (1, 0, 5)})
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_delete_removes_the_task(self):
+        task = self.task(cost=5)
+        self.task(cost=1)
+        FarmTask.objects.get(pk=task.pk).delete()
+        self.assertEqual(self.rollups(), {self.key(): (1, 0, 1)})
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_deleting_the_plot_keeps_its_tasks(self):
+        task = self.task(cost=5)
+        self.task(cost=1, plot=None)
+        self.plot.delete()
+        self.assertEqual(self.rollups(), {self.key(plot=False): (2, 0, 6)})
+        task.refresh_from_db()
+        task.cost = 7
+        task.save()
+        self.assertEqual(self.rollups(), {self.key(plot=False): (2, 0, 8)})
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_deleting_the_crop_keeps_its_tasks(self):
+        task = self.task(cost=5)
+        self.wheat.delete()
+        task.refresh_from_db()
+        task.cost = 7
+        task.save()
+        self.assertEqual(self.rollups(), {self.key(crop=False): (1, 0, 7)})
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_deleting_the_farmer_drops_their_rollups(self):
+        other = make_user('9000000012')
+        self.task(cost=5)
+        self.task(cost=3, farmer=other, plot=None)
+        other.delete()
+        self.assertEqual(self.rollups(), {self.key(): (1, 0, 5)})
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+    def test_raw_field_values_are_coerced(self):
+        self.task(cost='5.50', estimated_hours='2', due_date='2024-03-18')
+        self.assertEqual(self.rollups(), {self.key(): (1, 0, Decimal('5.50'))})
+        self.assertEqual(FarmTaskRollup.objects.get().month, date(2024, 3, 1))
+        self.assertEqual(self.rollups(), self.rebuilt())
+
+
+class FarmerIndexTests(TestCase):
+    def test_scoped_cursor_page_uses_the_farmer_created_on_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('checks the SQLite query plan')
+        farmer, after = make_user('9000000021'), timezone.now()
+        for model in (Plot, CropStock, Machinery, Manpower, FarmTask, TaskReminder):
+            index = next(index for index in model._meta.indexes if index.fields == ['farmer', 'created_on'])
+            # the query BaseAPIView runs for the second page of a farmer's list
+            queryset = model.objects.filter(farmer=farmer).order_by(*CURSOR_ORDERING).filter(
+                Q(created_on__lt=after) | Q(created_on=after, id__lt=farmer.pk)
+            )[:21]
+            plan = queryset.explain()
+            self.assertIn(f'USING INDEX {index.name}', plan, model.__name__)
+            # only ties on created_on get sorted by id ("RIGHT PART OF ORDER BY"), never the whole list
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan, model.__name__)
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        self.farmer = make_user('9000000031')
+        self.other = make_user('9000000032')
+        self.wheat = Crop.objects.create(name='Wheat')
+
+    def summary(self):
+        token = jwt.encode({'user_id': str(self.farmer.pk)}, settings.JWT_SECRET, algorithm='HS256')
+        response = self.client.get('/api/crop/dashboard-summary/', HTTP_AUTHORIZATION=token)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_totals_cover_only_the_farmers_live_rows(self):
+        today = timezone.localdate()
+        north = Plot.objects.create(name='North', area=2, farmer=self.farmer)
+        south = Plot.objects.create(name='South', area=3, farmer=self.farmer)
+        Plot.objects.create(name='Old', area=5, farmer=self.farmer, is_deleted=True)
+        Plot.objects.create(name='East', area=7, farmer=self.other)
+        CropPlot.objects.create(crop=self.wheat, plot=north, expected_harvest_date=today + timedelta(days=30))
+        CropPlot.objects.create(crop=self.wheat, plot=south, expected_harvest_date=today - timedelta(days=30))
+        for status, due in (('PENDING', today - timedelta(days=1)), ('IN_PROGRESS', None), ('COMPLETED', None)):
+            FarmTask.objects.create(title=status, status=status, due_date=due, farmer=self.farmer)
+        FarmTask.objects.create(title='Gone', farmer=self.farmer, is_deleted=True)
+        FarmTask.objects.create(title='Theirs', farmer=self.other)
+        CropStock.objects.create(crop=self.wheat, farmer=self.farmer, quantity_on_hold=40, sold_quantity=10)
+        CropStock.objects.create(crop=self.wheat, farmer=self.other, quantity_on_hold=99)
+        farmer = Farmer.objects.create(user=self.farmer)
+        wholesaler = Wholesaler.objects.create(name='Mandi', location='Pune', contact_number='1', storage_capacity=10)
+        sale = dict(farmer=farmer, wholesaler=wholesaler, crop=self.wheat, quantity=10)
+        Transaction.objects.create(total_cost=Decimal('250.00'), **sale)
+        Transaction.objects.create(total_cost=Decimal('100.00'), status='FAILED', **sale)
+        old = Transaction.objects.create(total_cost=Decimal('900.00'), **sale)
+        Transaction.objects.filter(pk=old.pk).update(transaction_date=old.transaction_date - timedelta(days=40))
+
+        summary = self.summary()
+        self.assertEqual(summary['plots'], {'count': 2, 'total_area': 5.0})
+        self.assertEqual(summary['crop_plans'], {'total': 2, 'active': 1})
+        self.assertEqual(summary['tasks']['by_status'], {'PENDING': 1, 'IN_PROGRESS': 1, 'COMPLETED': 1, 'CANCELLED': 0})
+        self.assertEqual((summary['tasks']['open'], summary['tasks']['overdue']), (2, 1))
+        self.assertEqual(summary['stock'], {'on_hold': 40.0, 'sold': 10.0})
+        self.assertEqual((summary['transactions']['count'], Decimal(str(summary['transactions']['value']))), (1, Decimal('250')))
+
+        Plot.objects.create(name='West', area=1, farmer=self.farmer)
+        self.assertEqual(self.summary()['plots'], {'count': 3, 'total_area': 6.0})
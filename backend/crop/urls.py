@@ -1,16 +1,21 @@
+from django.conf import settings
 from django.urls import path
+from portal.base import async_view
 from .views import (
     CropAPIView, FertilizerAPIView, PlotAPIView,
     CropPlotAPIView, CropFertilizerAPIView, FarmerAPIView,
     CropStockAPIView, MachineryAPIView, ManpowerAPIView,
-    FarmTaskAPIView, ResourceAPIView, MarketPriceAPIView,
-    MaharashtraCropDataView,
+    FarmTaskAPIView, TaskReminderAPIView, ResourceAPIView, MarketPriceAPIView,
+    MaharashtraCropDataView, DashboardSummaryView, CropStockTotalsView,
+    HarvestCalendarView, TaskReportView,
 )
 
+CropView = async_view(CropAPIView) if settings.ASYNC_VIEWS else CropAPIView
+
 urlpatterns = [
     # Crops
-    path('', CropAPIView.as_view(), name='crop-list'),
-    path('<uuid:id>/', CropAPIView.as_view(), name='crop-detail'),
+    path('', CropView.as_view(), name='crop-list'),
+    path('<uuid:id>/', CropView.as_view(), name='crop-detail'),
     
     # Fertilizers
     path('fertilizers/', FertilizerAPIView.as_view(), name='fertilizer-list'),
@@ -18,6 +23,7 @@ urlpatterns = [
     
     # Crop-Plots (Crop Planning)
     path('crop-plots/', CropPlotAPIView.as_view(), name='crop-plot-list'),
+    path('crop-plots/calendar/', HarvestCalendarView.as_view(), name='harvest-calendar'),
     path('crop-plots/<uuid:id>/', CropPlotAPIView.as_view(), name='crop-plot-detail'),
     
     # Crop-Fertilizers
@@ -26,6 +32,7 @@ urlpatterns = [
     
     # Crop Stocks
     path('stocks/', CropStockAPIView.as_view(), name='crop-stock-list'),
+    path('stocks/totals/', CropStockTotalsView.as_view(), name='crop-stock-totals'),
     path('stocks/<uuid:id>/', CropStockAPIView.as_view(), name='crop-stock-detail'),
     
     # Machinery
@@ -39,6 +46,9 @@ urlpatterns = [
     # Farm Tasks
     path('tasks/', FarmTaskAPIView.as_view(), name='task-list'),
     path('tasks/<uuid:id>/', FarmTaskAPIView.as_view(), name='task-detail'),
+    path('tasks/report/', TaskReportView.as_view(), name='task-report'),
+    path('tasks/reminders/', TaskReminderAPIView.as_view(), name='task-reminder-list'),
+    path('tasks/reminders/<uuid:id>/', TaskReminderAPIView.as_view(), name='task-reminder-detail'),
     
     # Resources (Library)
     path('resources/', ResourceAPIView.as_view(), name='resource-list'),
@@ -50,4 +60,7 @@ urlpatterns = [
     
     # Maharashtra Data
     path('maharashtra-data/', MaharashtraCropDataView.as_view(), name='maharashtra-crop-data'),
+
+    # Dashboard
+    path('dashboard-summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
 ]
@@ -2,7 +2,13 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 import requests
-from .models import Crop, Fertilizer, Plot, CropPlot, CropFertilizer, Farmer, CropStock, Machinery, Manpower, FarmTask, Resource, MarketPrice
+from datetime import timedelta
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import Crop, Fertilizer, Plot, CropPlot, CropFertilizer, Farmer, CropStock, CropStockTotals, Machinery, Manpower, FarmTask, FarmTaskRollup, TaskReminder, Resource, MarketPrice
 from .serializers import (
     CropGETSerializer, CropPOSTSerializer,
     FertilizerGETSerializer, FertilizerPOSTSerializer,
@@ -14,10 +20,13 @@ from .serializers import (
     MachineryGETSerializer, MachineryPOSTSerializer,
     ManpowerGETSerializer, ManpowerPOSTSerializer,
     FarmTaskGETSerializer, FarmTaskPOSTSerializer,
+    TaskReminderGETSerializer, TaskReminderPOSTSerializer,
     ResourceGETSerializer, ResourcePOSTSerializer,
     MarketPriceGETSerializer, MarketPricePOSTSerializer,
 )
 from portal.base import BaseAPIView  
+from portal.cache import cached_for_versions
+from wholeseller.models import Transaction
 
 class CropAPIView(BaseAPIView):
     model = Crop
@@ -38,6 +47,7 @@ class PlotAPIView(BaseAPIView):
     lookup = 'id'
     serializer_class = PlotGETSerializer
     post_serializer = PlotPOSTSerializer
+    owner_field = 'farmer'
 
 
 class CropPlotAPIView(BaseAPIView):
@@ -66,6 +76,7 @@ class CropStockAPIView(BaseAPIView):
     lookup = 'id'
     serializer_class = CropStockGETSerializer
     post_serializer = CropStockPOSTSerializer
+    owner_field = 'farmer'
 
 
 class MachineryAPIView(BaseAPIView):
@@ -73,6 +84,7 @@ class MachineryAPIView(BaseAPIView):
     lookup = 'id'
     serializer_class = MachineryGETSerializer
     post_serializer = MachineryPOSTSerializer
+    owner_field = 'farmer'
 
 
 class ManpowerAPIView(BaseAPIView):
@@ -80,6 +92,7 @@ class ManpowerAPIView(BaseAPIView):
     lookup = 'id'
     serializer_class = ManpowerGETSerializer
     post_serializer = ManpowerPOSTSerializer
+    owner_field = 'farmer'
 
 
 class FarmTaskAPIView(BaseAPIView):
@@ -87,6 +100,17 @@ class FarmTaskAPIView(BaseAPIView):
     lookup = 'id'
     serializer_class = FarmTaskGETSerializer
     post_serializer = FarmTaskPOSTSerializer
+    owner_field = 'farmer'
+    filter_fields = ['priority', 'task_type']
+
+
+class TaskReminderAPIView(BaseAPIView):
+    model = TaskReminder
+    lookup = 'id'
+    serializer_class = TaskReminderGETSerializer
+    post_serializer = TaskReminderPOSTSerializer
+    owner_field = 'farmer'
+    filter_fields = ['task']
 
 
 class ResourceAPIView(BaseAPIView):
@@ -159,3 +183,235 @@ class MaharashtraCropDataView(APIView):
             "source": "Government Agriculture Data (Mocked)",
             "data": mock_data
         }, status=status.HTTP_200_OK)
+
+
+class DashboardSummaryView(APIView):
+    """
+    Counts and totals for the logged in farmer's dashboard, aggregated in the
+    database over the farmer's own (indexed) rows. Not cached: any farmer's
+    write would retire every farmer's entry.
+    """
+    transaction_days = 30
+    batchable = True
+
+    def get(self, request):
+        return Response(self.get_summary(request.user.pk, timezone.localdate()), status=status.HTTP_200_OK)
+
+    def get_summary(self, user_id, today):
+        plots = Plot.objects.filter(farmer_id=user_id, is_deleted=False).aggregate(
+            count=Count('id'), total_area=Sum('area'),
+        )
+        plans = CropPlot.objects.filter(plot__farmer_id=user_id, is_deleted=False).aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(expected_harvest_date__isnull=True) | Q(expected_harvest_date__gte=today)),
+        )
+        open_tasks = Q(status__in=['PENDING', 'IN_PROGRESS'])
+        tasks = FarmTask.objects.filter(farmer_id=user_id, is_deleted=False).aggregate(
+            open=Count('id', filter=open_tasks),
+            overdue=Count('id', filter=open_tasks & Q(due_date__lt=today)),
+            **{value: Count('id', filter=Q(status=value)) for value, label in FarmTask.STATUS_CHOICES},
+        )
+        stock = CropStockTotals.objects.filter(farmer_id=user_id).aggregate(
+            on_hold=Sum('quantity_on_hold'), sold=Sum('sold_quantity'),
+        )
+        since = timezone.now() - timedelta(days=self.transaction_days)
+        transactions = Transaction.objects.filter(
+            farmer__user_id=user_id, status='COMPLETED', transaction_date__gte=since, is_deleted=False,
+        ).aggregate(count=Count('id'), value=Sum('total_cost'))
+        return {
+            'plots': {'count': plots['count'], 'total_area': plots['total_area'] or 0},
+            'crop_plans': plans,
+            'tasks': {
+                'by_status': {value: tasks[value] for value, label in FarmTask.STATUS_CHOICES},
+                'open': tasks['open'],
+                'overdue': tasks['overdue'],
+            },
+            'stock': {'on_hold': stock['on_hold'] or 0, 'sold': stock['sold'] or 0},
+            'transactions': {
+                'days': self.transaction_days,
+                'count': transactions['count'],
+                'value': transactions['value'] or 0,
+            },
+        }
+
+
+class CropStockTotalsView(APIView):
+    """
+    Stock on hold and sold per crop for the logged in farmer (admins may pass
+    ?farmer=<user id>), read from the maintained CropStockTotals rows instead
+    of summing the farmer's CropStock rows.
+    """
+    batchable = True
+
+    def get(self, request):
+        farmer_id = request.user.pk
+        if request.query_params.get('farmer') and getattr(request.user, 'is_admin', False):
+            farmer_id = request.query_params['farmer']
+        try:
+            rows = [
+                {
+                    'crop': row['crop_id'],
+                    'crop_name': row['crop__name'],
+                    'quantity_on_hold': row['quantity_on_hold'],
+                    'sold_quantity': row['sold_quantity'],
+                    'entries': row['entries'],
+                }
+                for row in CropStockTotals.objects.filter(farmer_id=farmer_id, entries__gt=0).order_by('crop__name').values(
+                    'crop_id', 'crop__name', 'quantity_on_hold', 'sold_quantity', 'entries',
+                )
+            ]
+        except ValidationError:
+            return Response({'msg': "farmer must be a user id"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'rows': rows,
+            'totals': {
+                'on_hold': sum(row['quantity_on_hold'] for row in rows),
+                'sold': sum(row['sold_quantity'] for row in rows),
+            },
+        }, status=status.HTTP_200_OK)
+
+
+class HarvestCalendarView(APIView):
+    """
+    Crop plans grouped by week or month of their expected harvest (or with
+    ?date=planting, planting) date, per crop and village, with the plot area
+    they cover. Farmers see their own plots; admins see every plot and may
+    narrow to ?farmer=<user id>. Cached until the next crop plan, plot or crop write.
+
+    ?period=week|month, ?start=YYYY-MM-DD (default today), ?weeks=N (default 12),
+    ?crop=<id>, ?village=<name>
+    """
+    periods = {'week': TruncWeek, 'month': TruncMonth}
+    date_fields = {'harvest': 'expected_harvest_date', 'planting': 'planting_date'}
+    default_weeks = 12
+    max_weeks = 104
+    batchable = True
+
+    def get(self, request):
+        params = request.query_params
+        period = params.get('period', 'week')
+        date_field = self.date_fields.get(params.get('date', 'harvest'))
+        if period not in self.periods or date_field is None:
+            return Response({'msg': "period must be week or month and date harvest or planting"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start = parse_date(params['start']) if params.get('start') else timezone.localdate()
+            weeks = int(params.get('weeks', self.default_weeks))
+        except ValueError:
+            start = None
+        if start is None or not 0 < weeks <= self.max_weeks:
+            return Response({'msg': f"start must be a date and weeks between 1 and {self.max_weeks}"}, status=status.HTTP_400_BAD_REQUEST)
+        filters = {
+            f'{date_field}__gte': start,
+            f'{date_field}__lt': start + timedelta(weeks=weeks),
+        }
+        if getattr(request.user, 'is_admin', False):
+            if params.get('farmer'):
+                filters['plot__farmer_id'] = params['farmer']
+        else:
+            filters['plot__farmer_id'] = request.user.pk
+        if params.get('crop'):
+            filters['crop_id'] = params['crop']
+        if params.get('village'):
+            filters['plot__village__iexact'] = params['village']
+        params_key = f'{period}:{date_field}:{start}:{weeks}:' + ':'.join(f'{key}={value}' for key, value in sorted(filters.items()))
+        try:
+            buckets = cached_for_versions(
+                'harvest-calendar', [CropPlot, Plot, Crop], params_key,
+                lambda: self.get_buckets(filters, self.periods[period](date_field)),
+            )
+        except ValidationError:
+            return Response({'msg': "farmer and crop must be ids"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'period': period,
+            'date': params.get('date', 'harvest'),
+            'start': start,
+            'end': start + timedelta(weeks=weeks),
+            'rows': buckets,
+        }, status=status.HTTP_200_OK)
+
+    def get_buckets(self, filters, bucket):
+        rows = CropPlot.objects.filter(is_deleted=False, plot__is_deleted=False, **filters).annotate(
+            bucket=bucket,
+        ).order_by('bucket', 'crop__name', 'plot__village').values(
+            'bucket', 'crop_id', 'crop__name', 'plot__village',
+        ).annotate(plans=Count('id'), area=Sum('plot__area'))
+        return [
+            {
+                'period_start': row['bucket'],
+                'crop': row['crop_id'],
+                'crop_name': row['crop__name'],
+                'village': row['plot__village'],
+                'plans': row['plans'],
+                'area': row['area'] or 0,
+            }
+            for row in rows
+        ]
+
+
+class TaskReportView(APIView):
+    """
+    Task count, cost and hours for the logged in farmer (admins may pass
+    ?farmer=<user id>), grouped by ?group=plot,crop,task_type,month (default
+    month) and read from the maintained FarmTaskRollup rows, so the cost
+    does not grow with the number of tasks. Variance compares actual against
+    estimated hours over completed tasks.
+
+    ?from=YYYY-MM, ?to=YYYY-MM (inclusive), ?plot=<id>, ?crop=<id>, ?task_type=
+    """
+    groups = {
+        'plot': ('plot_id', 'plot__name'),
+        'crop': ('crop_id', 'crop__name'),
+        'task_type': ('task_type',),
+        'month': ('month',),
+    }
+    batchable = True
+
+    def get(self, request):
+        params = request.query_params
+        group = [name for name in params.get('group', 'month').split(',') if name]
+        if not group or any(name not in self.groups for name in group):
+            return Response({'msg': f"group must be a comma separated list of {', '.join(self.groups)}"}, status=status.HTTP_400_BAD_REQUEST)
+        filters = {'farmer_id': request.user.pk, 'tasks__gt': 0}
+        if params.get('farmer') and getattr(request.user, 'is_admin', False):
+            filters['farmer_id'] = params['farmer']
+        for name, lookup in (('from', 'month__gte'), ('to', 'month__lte')):
+            if params.get(name):
+                try:
+                    month = parse_date(f"{params[name]}-01")
+                except ValueError:
+                    month = None
+                if month is None:
+                    return Response({'msg': f"{name} must be a month as YYYY-MM"}, status=status.HTTP_400_BAD_REQUEST)
+                filters[lookup] = month
+        for name in ('plot', 'crop', 'task_type'):
+            if params.get(name):
+                filters[name] = params[name]
+        fields = [field for name in group for field in self.groups[name]]
+        sums = {
+            name: Sum(name)
+            for name in ('tasks', 'completed', 'cost', 'estimated_hours', 'actual_hours', 'completed_estimated_hours', 'completed_actual_hours')
+        }
+        try:
+            rollups = FarmTaskRollup.objects.filter(**filters)
+            rows = [
+                {**{field.replace('__', '_'): row[field] for field in fields}, **self.measures(row)}
+                for row in rollups.order_by(*fields).values(*fields).annotate(**sums)
+            ]
+            totals = self.measures(rollups.aggregate(**sums))
+        except ValidationError:
+            return Response({'msg': "farmer, plot and crop must be ids"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'group': group, 'rows': rows, 'totals': totals}, status=status.HTTP_200_OK)
+
+    def measures(self, row):
+        estimated, actual = row['completed_estimated_hours'] or 0, row['completed_actual_hours'] or 0
+        return {
+            'tasks': row['tasks'] or 0,
+            'completed': row['completed'] or 0,
+            'cost': row['cost'] or 0,
+            'estimated_hours': row['estimated_hours'] or 0,
+            'actual_hours': row['actual_hours'] or 0,
+            'completed_estimated_hours': estimated,
+            'completed_actual_hours': actual,
+            'hours_variance': actual - estimated,
+            'hours_variance_pct': round((actual - estimated) / estimated * 100, 1) if estimated else None,
+        }
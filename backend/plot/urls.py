@@ -1,11 +1,15 @@
+from django.conf import settings
 from django.urls import path
+from portal.base import async_view
 from .views import WaterResourceAPIView
 from crop.views import PlotAPIView
 
+PlotView = async_view(PlotAPIView) if settings.ASYNC_VIEWS else PlotAPIView
+
 urlpatterns = [
     path('water-resources/', WaterResourceAPIView.as_view(), name='water-resource-list'),
     path('water-resources/<uuid:id>/', WaterResourceAPIView.as_view(), name='water-resource-detail'),
     
-    path('plots/', PlotAPIView.as_view(), name='plot-list'),
-    path('plots/<uuid:id>/', PlotAPIView.as_view(), name='plot-detail'),
+    path('plots/', PlotView.as_view(), name='plot-list'),
+    path('plots/<uuid:id>/', PlotView.as_view(), name='plot-detail'),
 ]
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PortalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portal'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
+        from .search import create_search_tables
+        post_migrate.connect(create_search_tables, sender=self)
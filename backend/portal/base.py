@@ -1,17 +1,34 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db import models
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from django.db import models, transaction, IntegrityError
 from uuid import uuid4
 from django.core.exceptions import ValidationError
 from .constants import POST, PUT, DELETE, GET, GETALL
 from django.db.models import Q
 from rest_framework import serializers
+from .pagination import paginate_by_cursor, InvalidCursor
+from .counts import COUNT_MODES, get_count, normalize_params, batched_writes
+from .planning import get_plan, get_columns, get_serializer_fields, get_related_models
+from .compiled import compile_serializer
+from .search import search_queryset
+from .conditional import get_list_state, make_etag, set_validators, to_timestamp
+from .cache import get_response_cache, get_versions, response_cache_key
+from .filters import get_filters, FilterError
+from . import bulk
+from .renderers import RowsRenderer, NDJSONRenderer, CSVRenderer, ORJSONRenderer, stream_rows
+from django.http import JsonResponse, QueryDict, StreamingHttpResponse
+from django.views import View
+from asgiref.sync import sync_to_async
+import json
+from django.utils.cache import get_conditional_response
 
 
 class BaseModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
 
-    created_on = models.DateTimeField(auto_now_add=True)
+    created_on = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_on = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
 
@@ -24,10 +41,25 @@ class UUIDListField(serializers.ListField):
     child = serializers.UUIDField()
 
 
-class BaseAPIView(APIView):
+class QueryParamError(Exception):
+    pass
+
+
+class BaseViewMixin:
+    """Model/serializer configuration and queryset helpers shared by BaseAPIView and AsyncBaseAPIView."""
     allowed_methods = [GET, GETALL, POST, PUT, DELETE]
     search_ignore_fields = []
+    # non-indexed fields (or relation paths) that may still be used as list filters
+    filter_fields = []
+    related_models = {}
     archive_in_delete = False
+    # FK to accounts.User naming the farmer a row belongs to: non-admin users
+    # only see and write their own rows
+    owner_field = None
+    # query params that shape the page but not the set of rows it is cut from
+    page_params = ['pg', 'limit', 'cursor', 'count', 'fields', 'exclude', 'format', 'stream']
+    # query params that control the list response and are never used as filters
+    list_params = page_params + ['q']
 
     def __init__(self):
         self.model = self.get_model()
@@ -61,6 +93,65 @@ class BaseAPIView(APIView):
         except:
             return self.model.objects.all().order_by(self.get_order())
 
+    def get_scope(self, request):
+        """Id of the user the request is limited to, None when it may see every row."""
+        if self.owner_field is None or getattr(request.user, 'is_admin', False):
+            return None
+        return request.user.pk
+
+    def scope_queryset(self, queryset, scope):
+        if scope is None:
+            return queryset
+        return queryset.filter(**{self.owner_field: scope})
+
+    def scope_data(self, data, scope):
+        """The payload with its owner set to the scoped user."""
+        if scope is None or not isinstance(data, dict):
+            return data
+        if isinstance(data, QueryDict):
+            scoped = QueryDict(mutable=True)
+            for key, values in data.lists():
+                scoped.setlist(key, values)
+        else:
+            scoped = dict(data)
+        scoped[self.owner_field] = str(scope)
+        return scoped
+
+    def get_field_names(self, params):
+        """Serializer fields picked with fields=/exclude=, None means all of them"""
+        fields, exclude = params.get('fields'), params.get('exclude')
+        if not fields and not exclude:
+            return None
+        available = get_serializer_fields(self.serializer)
+        requested = [f for f in (fields or '').split(',') if f]
+        excluded = [f for f in (exclude or '').split(',') if f]
+        unknown = [f for f in requested + excluded if f not in available]
+        if unknown:
+            raise QueryParamError("Unknown field(s): " + ", ".join(unknown))
+        return frozenset(f for f in (requested or available) if f not in excluded)
+
+    def optimize_queryset(self, queryset, field_names=None):
+        select_related, prefetch_related = get_plan(self.serializer, field_names)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if field_names is not None:
+            # only read the columns the trimmed serializer renders
+            columns = get_columns(self.serializer, field_names)
+            if columns is not None:
+                queryset = queryset.only(*columns)
+        return queryset
+
+    def serialize(self, instance, field_names=None, many=False):
+        serializer = self.serializer(instance, many=many)
+        if field_names is not None:
+            fields = serializer.child.fields if many else serializer.fields
+            for name in list(fields):
+                if name not in field_names:
+                    fields.pop(name)
+        return serializer.data
+
     def get_post_serializer(self):
         try:
             return self.post_serializer
@@ -81,12 +172,6 @@ class BaseAPIView(APIView):
         except: 
             return {}
 
-    def check_if_method_allowed(self, method):
-        if method not in self.allowed_methods:
-            if method is GETALL:
-                return Response({'msg': "Not Found"}, status=404)
-            return Response({'msg': "Method not allowed"}, status=405)
-    
     def search_query_filter(self, search_query, related_fields=None):
         if search_query:
             fields = [f.name for f in self.model._meta.fields if not f.is_relation]
@@ -102,6 +187,79 @@ class BaseAPIView(APIView):
         else:
             return Q()
 
+    def search_queryset(self, queryset, search):
+        # models with `search_fields` are served from their full-text index,
+        # ranked by relevance; everything else falls back to icontains
+        ranked = search_queryset(queryset, search)
+        if ranked is None:
+            return queryset.filter(self.search_query_filter(search_query=search))
+        return ranked
+
+    def filter_queryset(self, queryset, params):
+        search = params.get('q', '')
+        if search:
+            queryset = self.search_queryset(queryset, search)
+        filters = get_filters(self.model, params, self.list_params, self.filter_fields)
+        if filters:
+            queryset = queryset.filter(**filters)
+        return queryset
+
+
+class BaseAPIView(BaseViewMixin, APIView):
+    # ?format=ndjson|csv renders the rows as lines; add &stream=1 to export the whole list
+    renderer_classes = [ORJSONRenderer] + api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer, CSVRenderer]
+    stream_chunk_size = 2000
+    # build list rows straight from .values_list() when the serializer only has plain columns
+    compiled_rows = True
+    # answer If-None-Match/If-Modified-Since with 304 before serializing
+    conditional_get = True
+    # list responses are cached until the next write to any model they render
+    cache_responses = True
+    cache_timeout = 60 * 5
+    # array payloads on POST/PUT/DELETE are written in one transaction
+    bulk_max_items = 1000
+    bulk_batch_size = 500
+    # may be called through /api/batch
+    batchable = True
+
+    def check_if_method_allowed(self, method):
+        if method not in self.allowed_methods:
+            if method is GETALL:
+                return Response({'msg': "Not Found"}, status=404)
+            return Response({'msg': "Method not allowed"}, status=405)
+    
+    def stream(self, request, queryset, field_names=None):
+        """Export every row of `queryset`, serialized and written a chunk at a time."""
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, RowsRenderer):
+            return Response({'msg': "stream needs format=ndjson or format=csv"}, status=400)
+        fields = [
+            name for name, field in self.serializer().fields.items()
+            if not field.write_only and (field_names is None or name in field_names)
+        ]
+        compiled = compile_serializer(self.serializer, field_names) if self.compiled_rows else None
+        if compiled:
+            serialize, queryset = compiled.rows, compiled.values(queryset)
+        else:
+            serialize, queryset = (lambda objs: self.serialize(objs, field_names, many=True)), self.optimize_queryset(queryset, field_names)
+
+        def batches():
+            batch = []
+            for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+                batch.append(obj)
+                if len(batch) == self.stream_chunk_size:
+                    yield serialize(batch)
+                    batch = []
+            if batch:
+                yield serialize(batch)
+
+        response = StreamingHttpResponse(
+            stream_rows(renderer, batches(), fields),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{self.model._meta.model_name}.{renderer.format}"'
+        return response
+
     def get(self, request, id=None, *args, **kwargs):
         if id == 'list' or not id:
             if not GETALL in self.allowed_methods:
@@ -109,36 +267,111 @@ class BaseAPIView(APIView):
             # print("get all")
             pg = request.GET.get("pg") or 0
             limit = request.GET.get("limit") or 20
-            search = request.GET.get('q', '')
-            print(search)
-            queryset = self.get_queryset()
-            if search:
-                queryset = queryset.filter(self.search_query_filter(search_query=search))
-            for param in self.request.query_params:
-                if param not in ['pg', 'q', 'limit']:
-                    param_value = self.request.query_params[param]
-                    if self.request.query_params[param] == 'true':
-                        param_value = True
-                    if self.request.query_params[param] == 'false':
-                        param_value = False
-                    queryset = queryset.filter(**{param: param_value})
-            count = queryset.count()
-            objs = queryset[
-                int(pg) * int(limit) : (int(pg) + 1) * int(limit)
-            ]
-            return Response(
-                data={"rows": self.serializer(objs, many=True).data, "count": count, **self.get_extra_list_data()},
+            count_mode = request.query_params.get('count')
+            if count_mode not in COUNT_MODES:
+                return Response({'msg': "count must be one of false, approx, exact"}, status=400)
+            scope = self.get_scope(request)
+            try:
+                field_names = self.get_field_names(request.query_params)
+                queryset = self.filter_queryset(self.scope_queryset(self.get_queryset(), scope), request.query_params)
+            except (QueryParamError, FilterError) as e:
+                return Response({'msg': str(e)}, status=400)
+            if request.query_params.get('stream') in ('1', 'true'):
+                return self.stream(request, queryset, field_names)
+            rows_key = normalize_params(request.query_params, self.page_params)
+            params_key = normalize_params(request.query_params)
+            if scope is not None:
+                # counts, validators and cached pages are per owner
+                rows_key, params_key = f'{rows_key}:{scope}', f'{params_key}:{scope}'
+            label = self.model._meta.label_lower
+            versions = None
+            if self.conditional_get or self.cache_responses:
+                versions = get_versions([self.model, *get_related_models(self.serializer)])
+            validators = None
+            if self.conditional_get:
+                last_modified, total = get_list_state(queryset, rows_key, versions[label])
+                validators = (
+                    make_etag(label, last_modified, total, sorted(versions.items()), params_key),
+                    to_timestamp(last_modified),
+                )
+                not_modified = get_conditional_response(request, etag=validators[0], last_modified=validators[1])
+                if not_modified is not None:
+                    return not_modified
+            cache_key = None
+            if self.cache_responses:
+                cache_key = response_cache_key(self.model, versions, params_key)
+                data = get_response_cache().get(cache_key)
+                if data is not None:
+                    response = Response(data=data, status=200)
+                    if validators:
+                        set_validators(response, *validators)
+                    return response
+            if validators and count_mode is None:
+                count = total
+            else:
+                count = get_count(queryset, count_mode, rows_key)
+            compiled = None
+            if self.compiled_rows and 'cursor' not in request.query_params:
+                compiled = compile_serializer(self.serializer, field_names)
+            if compiled is None:
+                queryset = self.optimize_queryset(queryset, field_names)
+            page = {}
+            if 'cursor' in request.query_params:
+                if self.get_order() != '-created_on':
+                    return Response({'msg': "Cursor pagination is not supported for this list"}, status=400)
+                try:
+                    objs, page['next'] = paginate_by_cursor(queryset, request.query_params['cursor'], int(limit))
+                except InvalidCursor:
+                    return Response({'msg': "Invalid cursor"}, status=400)
+            else:
+                objs = (compiled.values(queryset) if compiled else queryset)[
+                    int(pg) * int(limit) : (int(pg) + 1) * int(limit)
+                ]
+            rows = compiled.rows(objs) if compiled else self.serialize(objs, field_names, many=True)
+            response = Response(
+                data={"rows": rows, "count": count, **page, **self.get_extra_list_data()},
                 status=200,
             )
+            if cache_key:
+                get_response_cache().set(cache_key, response.data, self.cache_timeout)
+            if validators:
+                set_validators(response, *validators)
+            return response
         else:
             if not GET in self.allowed_methods:
                 return Response({'msg': "Method not allowed"}, status=405)
             # print("get by id")
             try:
-                return Response(
-                    data=self.serializer(self.model.objects.get(id=id)).data,
+                field_names = self.get_field_names(request.query_params)
+            except QueryParamError as e:
+                return Response({'msg': str(e)}, status=400)
+            queryset = self.scope_queryset(self.model.objects.all(), self.get_scope(request))
+            try:
+                validators = None
+                if self.conditional_get:
+                    updated_on = queryset.filter(id=id).values_list('updated_on', flat=True).first()
+                    if updated_on is not None:
+                        # the row embeds fields of related models (crop_name, ...), so
+                        # a write to one of those has to change the ETag too
+                        related = get_versions(get_related_models(self.serializer))
+                        validators = (
+                            make_etag(
+                                self.model._meta.label_lower, id, updated_on, sorted(related.items()),
+                                normalize_params(request.query_params),
+                            ),
+                            to_timestamp(updated_on),
+                        )
+                        not_modified = get_conditional_response(request, etag=validators[0], last_modified=validators[1])
+                        if not_modified is not None:
+                            return not_modified
+                obj = self.optimize_queryset(queryset, field_names).get(id=id)
+                response = Response(
+                    data=self.serialize(obj, field_names),
                     status=200,
                 )
+                if validators:
+                    set_validators(response, *validators)
+                return response
             except (self.model.DoesNotExist, ValidationError):
                 return Response(
                     data={
@@ -152,9 +385,11 @@ class BaseAPIView(APIView):
         if not POST in self.allowed_methods:
             return Response({'msg': "Method not allowed"}, status=405)
         # print("in post")
-        
+        if isinstance(request.data, list):
+            return self.bulk_post(request)
+
         serializer = self.get_post_serializer()
-        serializer = serializer(data=request.data)
+        serializer = serializer(data=self.scope_data(request.data, self.get_scope(request)))
         if serializer.is_valid():
             obj = serializer.save()
             return Response(data={'msg': 'Saved Successfully', 'id': obj.id}, status=201)
@@ -166,9 +401,12 @@ class BaseAPIView(APIView):
         if not PUT in self.allowed_methods:
             return Response({'msg': "Method not allowed"}, status=405)
         # print("in put")
+        if id is None and isinstance(request.data, list):
+            return self.bulk_put(request)
+        scope = self.get_scope(request)
         filter = {self.lookup: id}
         try:
-            obj = self.model.objects.get(**filter)
+            obj = self.scope_queryset(self.model.objects.all(), scope).get(**filter)
         except (self.model.DoesNotExist, ValidationError):
             return Response(
                 data={
@@ -178,7 +416,7 @@ class BaseAPIView(APIView):
                 status=400,
             )
         serializer = self.get_put_serializer()
-        serializer = serializer(obj, data=request.data, partial=True)
+        serializer = serializer(obj, data=self.scope_data(request.data, scope), partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(data={'msg': 'Saved Successfully', 'id': obj.id}, status=202)
@@ -188,9 +426,11 @@ class BaseAPIView(APIView):
         if not DELETE in self.allowed_methods:
             return Response({'msg': "Method not allowed"}, status=405)
         # print("in delete")
+        if id is None:
+            return self.bulk_delete(request)
         filter = {self.lookup: id}
         try:
-            obj = self.model.objects.get(**filter)
+            obj = self.scope_queryset(self.model.objects.all(), self.get_scope(request)).get(**filter)
             if self.archive_in_delete:
                 obj.is_deleted = True
                 obj.save()
@@ -210,6 +450,246 @@ class BaseAPIView(APIView):
             )
 
 
+    def to_lookup_values(self, values):
+        field = self.model._meta.get_field(self.lookup)
+        if any(value is None for value in values):
+            raise ValidationError("missing lookup value")
+        return [field.to_python(value) for value in values]
+
+    def check_bulk_size(self, items):
+        if len(items) > self.bulk_max_items:
+            return Response({'msg': f"At most {self.bulk_max_items} items can be sent at once"}, status=400)
+
+    def bulk_post(self, request):
+        response = self.check_bulk_size(request.data)
+        if response:
+            return response
+        scope = self.get_scope(request)
+        data = [self.scope_data(item, scope) for item in request.data]
+        serializer = self.get_post_serializer()(data=data, many=True)
+        if not serializer.is_valid():
+            return Response(data={'errors': serializer.errors}, status=400)
+        try:
+            with transaction.atomic(), batched_writes():
+                objs = bulk.bulk_create(serializer, self.bulk_batch_size)
+        except IntegrityError as e:
+            return Response(data={'msg': str(e)}, status=400)
+        return Response(
+            data={'msg': 'Saved Successfully', 'results': [{'id': obj.id, 'status': 201} for obj in objs]},
+            status=201,
+        )
+
+    def bulk_put(self, request):
+        response = self.check_bulk_size(request.data)
+        if response:
+            return response
+        try:
+            ids = self.to_lookup_values([item.get(self.lookup) for item in request.data])
+        except (AttributeError, ValidationError):
+            return Response({'msg': f"Every item needs a valid {self.lookup}"}, status=400)
+        scope = self.get_scope(request)
+        objs = self.scope_queryset(self.model.objects.all(), scope).in_bulk(ids, field_name=self.lookup)
+        put_serializer = self.get_put_serializer()
+        serializers_, errors = [], []
+        for pk, item in zip(ids, request.data):
+            obj = objs.get(pk)
+            if obj is None:
+                serializers_.append(None)
+                errors.append({self.lookup: ["object does not exists"]})
+                continue
+            serializer = put_serializer(obj, data=self.scope_data(item, scope), partial=True)
+            serializers_.append(serializer)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+        if any(errors):
+            return Response(data={'errors': errors}, status=400)
+        try:
+            with transaction.atomic(), batched_writes():
+                if serializers_:
+                    bulk.bulk_update(serializers_, self.bulk_batch_size)
+        except IntegrityError as e:
+            return Response(data={'msg': str(e)}, status=400)
+        return Response(
+            data={'msg': 'Saved Successfully', 'results': [{'id': s.instance.id, 'status': 202} for s in serializers_]},
+            status=202,
+        )
+
+    def bulk_delete(self, request):
+        ids = request.data if isinstance(request.data, list) else request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'msg': "Send a list of ids to delete"}, status=400)
+        response = self.check_bulk_size(ids)
+        if response:
+            return response
+        try:
+            ids = self.to_lookup_values(ids)
+            with transaction.atomic(), batched_writes():
+                queryset = self.scope_queryset(self.model.objects.all(), self.get_scope(request))
+                objs = list(queryset.filter(**{f"{self.lookup}__in": ids}).select_for_update())
+                if self.archive_in_delete:
+                    for obj in objs:
+                        obj.is_deleted = True
+                    bulk.bulk_update_objects(self.model, objs, ['is_deleted'], self.bulk_batch_size)
+                else:
+                    self.model.objects.filter(pk__in=[obj.pk for obj in objs]).delete()
+        except ValidationError:
+            return Response({'msg': f"Every item needs a valid {self.lookup}"}, status=400)
+        found = {getattr(obj, self.lookup) for obj in objs}
+        return Response(
+            data={
+                "msg": "Deleted successfully",
+                "results": [{'id': pk, 'status': 200 if pk in found else 404} for pk in ids],
+            },
+            status=200,
+        )
+
+
+class AsyncBaseAPIView(BaseViewMixin, View):
+    """
+    BaseAPIView with async handlers, for views served by an ASGI server.
+    Lookups, counts and page reads go through the async ORM; search,
+    validation and serialization are synchronous and run via sync_to_async.
+    Conditional GET, the response cache, exports and bulk payloads are only
+    available on BaseAPIView. Build one from a BaseAPIView with async_view().
+    """
+    batchable = True
+
+    def respond(self, data, status=200):
+        return JsonResponse(data, status=status, encoder=JSONEncoder)
+
+    def does_not_exist(self, suffix=''):
+        return self.respond(
+            {"msg": str(self.model._meta).split(".")[1] + " object does not exists" + suffix},
+            status=400,
+        )
+
+    def get_data(self, request):
+        if request.content_type == 'application/json':
+            return json.loads(request.body or b'{}')
+        data = request.POST.copy()
+        data.update(request.FILES)
+        return data
+
+    async def get(self, request, id=None, *args, **kwargs):
+        params = request.GET
+        scope = await sync_to_async(self.get_scope)(request)
+        if id == 'list' or not id:
+            if not GETALL in self.allowed_methods:
+                return self.respond({'msg': "Not Found"}, status=404)
+            pg = params.get("pg") or 0
+            limit = params.get("limit") or 20
+            count_mode = params.get('count')
+            if count_mode not in COUNT_MODES:
+                return self.respond({'msg': "count must be one of false, approx, exact"}, status=400)
+            try:
+                field_names = self.get_field_names(params)
+                queryset = await sync_to_async(self.filter_queryset)(self.scope_queryset(self.get_queryset(), scope), params)
+            except (QueryParamError, FilterError) as e:
+                return self.respond({'msg': str(e)}, status=400)
+            if count_mode == 'exact':
+                count = await queryset.acount()
+            else:
+                rows_key = normalize_params(params, self.page_params)
+                if scope is not None:
+                    rows_key = f'{rows_key}:{scope}'
+                count = await sync_to_async(get_count)(queryset, count_mode, rows_key)
+            queryset = self.optimize_queryset(queryset, field_names)
+            page = {}
+            if 'cursor' in params:
+                if self.get_order() != '-created_on':
+                    return self.respond({'msg': "Cursor pagination is not supported for this list"}, status=400)
+                try:
+                    objs, page['next'] = await sync_to_async(paginate_by_cursor)(queryset, params['cursor'], int(limit))
+                except InvalidCursor:
+                    return self.respond({'msg': "Invalid cursor"}, status=400)
+            else:
+                objs = [obj async for obj in queryset[int(pg) * int(limit) : (int(pg) + 1) * int(limit)]]
+            rows = await sync_to_async(self.serialize)(objs, field_names, many=True)
+            return self.respond({"rows": rows, "count": count, **page, **self.get_extra_list_data()})
+        if not GET in self.allowed_methods:
+            return self.respond({'msg': "Method not allowed"}, status=405)
+        try:
+            field_names = self.get_field_names(params)
+        except QueryParamError as e:
+            return self.respond({'msg': str(e)}, status=400)
+        try:
+            queryset = self.scope_queryset(self.model.objects.all(), scope)
+            obj = await self.optimize_queryset(queryset, field_names).aget(id=id)
+        except (self.model.DoesNotExist, ValidationError):
+            return self.does_not_exist(", Invalid ID")
+        return self.respond(await sync_to_async(self.serialize)(obj, field_names))
+
+    async def save(self, serializer):
+        """Validate and save in one worker thread; returns the object or None when invalid."""
+        def save():
+            return serializer.save() if serializer.is_valid() else None
+        return await sync_to_async(save)()
+
+    async def post(self, request, *args, **kwargs):
+        if not POST in self.allowed_methods:
+            return self.respond({'msg': "Method not allowed"}, status=405)
+        try:
+            data = self.get_data(request)
+        except ValueError:
+            return self.respond({'msg': "Invalid JSON"}, status=400)
+        if isinstance(data, list):
+            return self.respond({'msg': "Bulk payloads are not supported on this endpoint"}, status=400)
+        scope = await sync_to_async(self.get_scope)(request)
+        serializer = self.get_post_serializer()(data=self.scope_data(data, scope))
+        obj = await self.save(serializer)
+        if obj is None:
+            return self.respond(serializer.errors, status=400)
+        return self.respond({'msg': 'Saved Successfully', 'id': obj.id}, status=201)
+
+    async def put(self, request, id=None, *args, **kwargs):
+        if not PUT in self.allowed_methods:
+            return self.respond({'msg': "Method not allowed"}, status=405)
+        try:
+            data = self.get_data(request)
+        except ValueError:
+            return self.respond({'msg': "Invalid JSON"}, status=400)
+        if id is None or isinstance(data, list):
+            return self.respond({'msg': "Bulk payloads are not supported on this endpoint"}, status=400)
+        scope = await sync_to_async(self.get_scope)(request)
+        try:
+            obj = await self.scope_queryset(self.model.objects.all(), scope).aget(**{self.lookup: id})
+        except (self.model.DoesNotExist, ValidationError):
+            return self.does_not_exist()
+        serializer = self.get_put_serializer()(obj, data=self.scope_data(data, scope), partial=True)
+        if await self.save(serializer) is None:
+            return self.respond(serializer.errors, status=400)
+        return self.respond({'msg': 'Saved Successfully', 'id': obj.id}, status=202)
+
+    async def delete(self, request, id=None, *args, **kwargs):
+        if not DELETE in self.allowed_methods:
+            return self.respond({'msg': "Method not allowed"}, status=405)
+        if id is None:
+            return self.respond({'msg': "Bulk payloads are not supported on this endpoint"}, status=400)
+        scope = await sync_to_async(self.get_scope)(request)
+        try:
+            obj = await self.scope_queryset(self.model.objects.all(), scope).aget(**{self.lookup: id})
+        except (self.model.DoesNotExist, ValidationError):
+            return self.does_not_exist()
+        if self.archive_in_delete:
+            obj.is_deleted = True
+            await obj.asave()
+        else:
+            await obj.adelete()
+        return self.respond({"msg": "Deleted successfully"})
+
+
+def async_view(view):
+    """
+    AsyncBaseAPIView configured like the BaseAPIView subclass `view` (model,
+    serializers, owner scope, filter fields, ...), for the same endpoint
+    served by an ASGI server.
+    """
+    handlers = {'get', 'post', 'put', 'delete'} & set(vars(view))
+    if handlers:
+        raise TypeError(f"{view.__name__} overrides {', '.join(sorted(handlers))}, which AsyncBaseAPIView can't reuse")
+    config = {name: value for name, value in vars(view).items() if not name.startswith('__')}
+    return type(f'Async{view.__name__}', (AsyncBaseAPIView,), {'__module__': view.__module__, **config})
+
+
 def get_base_model_serializer(model, fields='__all__'):
     def create_meta_class():
         return type('Meta', (), {'model': model, 'fields': fields})
@@ -0,0 +1,112 @@
+import json
+import logging
+from contextvars import copy_context
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections
+from asgiref.sync import async_to_sync
+from django.http import HttpRequest, JsonResponse, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+# headers of the batch request that must not leak into its sub-requests
+PER_REQUEST_META = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE', 'CONTENT_TYPE', 'CONTENT_LENGTH')
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS, thread_name_prefix='batch')
+    return _executor
+
+
+def build_request(request, method, path, body=None):
+    """A copy of `request` (same user and headers) pointed at another route."""
+    path, _, query = path.partition('?')
+    content = json.dumps(body).encode() if body is not None else b''
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = path
+    sub.META = {key: value for key, value in request.META.items() if key not in PER_REQUEST_META}
+    sub.META.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+    })
+    sub.GET = QueryDict(query)
+    sub._stream = BytesIO(content)
+    sub._read_started = False
+    sub.user = request.user
+    sub._dont_enforce_csrf_checks = True
+    return sub
+
+
+def run_request(request, item, in_thread=False):
+    try:
+        method = str(item.get('method', 'GET')).upper()
+        path = item.get('path') or ''
+        if method not in BATCH_METHODS:
+            return {'status': 405, 'body': {'msg': "Method not allowed"}}
+        if not path.startswith('/api/'):
+            path = '/api' + (path if path.startswith('/') else '/' + path)
+        try:
+            match = resolve(path.partition('?')[0])
+        except Resolver404:
+            return {'status': 404, 'body': {'msg': "Not Found"}}
+        view_class = getattr(match.func, 'view_class', None)
+        if not getattr(view_class, 'batchable', False):
+            return {'status': 400, 'body': {'msg': "This endpoint can't be batched"}}
+        view = async_to_sync(match.func) if getattr(view_class, 'view_is_async', False) else match.func
+        response = view(build_request(request, method, path, item.get('body')), *match.args, **match.kwargs)
+        if isinstance(response, Response):
+            return {'status': response.status_code, 'body': response.data}
+        if isinstance(response, JsonResponse):
+            return {'status': response.status_code, 'body': json.loads(response.content)}
+        if response.streaming:
+            response.close()
+            return {'status': 400, 'body': {'msg': "Exports can't be batched"}}
+        return {'status': response.status_code, 'body': response.content.decode()}
+    except Exception:
+        logger.exception("Batched %s %s failed", item.get('method'), item.get('path'))
+        return {'status': 500, 'body': {'msg': "Internal server error"}}
+    finally:
+        if in_thread:
+            connections.close_all()
+
+
+class BatchAPIView(APIView):
+    """
+    Run several API calls in one round trip. POST
+        {"requests": [{"method": "GET", "path": "/crop/?limit=5"}, ...], "parallel": true}
+    and get back {"responses": [{"status": 200, "body": {...}}, ...]} in the same
+    order. Paths are relative to /api. Sub-requests reuse the authentication of
+    the batch request; with parallel=true a batch of GETs runs on a thread pool.
+    """
+
+    def post(self, request):
+        data = request.data
+        items = data.get('requests') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return Response({'msg': "Send a list of requests"}, status=400)
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return Response({'msg': f"At most {settings.BATCH_MAX_REQUESTS} requests can be batched"}, status=400)
+        parallel = isinstance(data, dict) and data.get('parallel') is True
+        # writes keep their order, so only read-only batches are spread over threads
+        if parallel and len(items) > 1 and all(str(item.get('method', 'GET')).upper() == 'GET' for item in items):
+            # each worker runs in a copy of this context so its records keep the request id
+            contexts = [copy_context() for _ in items]
+            responses = list(get_executor().map(
+                lambda item, context: context.run(run_request, request._request, item, True), items, contexts,
+            ))
+        else:
+            responses = [run_request(request._request, item) for item in items]
+        return Response({'responses': responses}, status=200)
@@ -0,0 +1,81 @@
+from django.db import models, router
+from django.db.models.signals import pre_save, post_save
+from django.utils import timezone
+from .counts import batched_writes
+
+# bulk_create/bulk_update skip Model.save() and the save signals. Models that
+# override save() are written one by one instead, and for the rest the signals
+# are sent by hand so counters, search index and caches stay in step.
+
+
+def has_custom_save(model):
+    return model.save is not models.Model.save
+
+
+def split_many_to_many(model, data):
+    return {field.name: data.pop(field.name) for field in model._meta.many_to_many if field.name in data}
+
+
+def send_save_signals(model, objs, created, update_fields=None, when='post'):
+    using = router.db_for_write(model)
+    with batched_writes():
+        for obj in objs:
+            if when == 'pre':
+                pre_save.send(sender=model, instance=obj, raw=False, using=using, update_fields=update_fields)
+            else:
+                post_save.send(sender=model, instance=obj, created=created, raw=False, using=using, update_fields=update_fields)
+
+
+def bulk_create(serializer, batch_size=None):
+    """Create the validated items of a many=True serializer; call inside a transaction."""
+    model = serializer.child.Meta.model
+    if has_custom_save(model):
+        return serializer.save()
+    objs, relations = [], []
+    for data in serializer.validated_data:
+        data = dict(data)
+        relations.append(split_many_to_many(model, data))
+        objs.append(model(**data))
+    send_save_signals(model, objs, True, when='pre')
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    send_save_signals(model, objs, True)
+    for obj, m2m in zip(objs, relations):
+        for name, value in m2m.items():
+            getattr(obj, name).set(value)
+    return objs
+
+
+def bulk_update_objects(model, objs, fields, batch_size=None):
+    fields = set(fields)
+    now = timezone.now()
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            for obj in objs:
+                setattr(obj, field.attname, now)
+            fields.add(field.name)
+    update_fields = frozenset(fields)
+    send_save_signals(model, objs, False, update_fields, when='pre')
+    model.objects.bulk_update(objs, list(fields), batch_size=batch_size)
+    send_save_signals(model, objs, False, update_fields)
+    return objs
+
+
+def bulk_update(serializers, batch_size=None):
+    """Apply a list of validated partial update serializers; call inside a transaction."""
+    model = serializers[0].Meta.model
+    if has_custom_save(model):
+        return [serializer.save() for serializer in serializers]
+    objs, fields, relations = [], set(), []
+    for serializer in serializers:
+        obj = serializer.instance
+        data = dict(serializer.validated_data)
+        relations.append(split_many_to_many(model, data))
+        for attr, value in data.items():
+            setattr(obj, attr, value)
+        fields.update(data)
+        objs.append(obj)
+    bulk_update_objects(model, objs, fields, batch_size)
+    for obj, m2m in zip(objs, relations):
+        for name, value in m2m.items():
+            getattr(obj, name).set(value)
+    return objs
@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from .counts import get_counter, model_label
+
+# List responses are cached under the write versions of every model they
+# render, so a save or delete of the model itself or of a related one it
+# embeds (Crop for crop_name, User for farmer_name, ...) retires the entry.
+RESPONSE_CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+
+
+def get_response_cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def get_versions(models):
+    """Current write version of each model, keyed by label."""
+    from .models import ModelCounter
+    labels = [model_label(model) for model in models]
+    versions = dict(ModelCounter.objects.filter(label__in=labels).values_list('label', 'version'))
+    for model in models:
+        if model_label(model) not in versions:
+            versions[model_label(model)] = get_counter(model).version
+    return versions
+
+
+def response_cache_key(model, versions, params_key):
+    return _cache_key(model_label(model), versions, params_key)
+
+
+def _cache_key(name, versions, params_key):
+    stamp = '.'.join(f'{label}:{version}' for label, version in sorted(versions.items()))
+    digest = hashlib.md5(f'{stamp}|{params_key}'.encode()).hexdigest()
+    return f'response:{name}:{digest}'
+
+
+def cached_for_versions(name, models, params_key, build, timeout=60 * 5):
+    """
+    build() cached in the response cache until the next write to any of
+    `models`; params_key separates entries (per user, date, ...).
+    """
+    key = _cache_key(name, get_versions(models), params_key)
+    cache = get_response_cache()
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout)
+    return data
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries also expire `ttl` seconds after being set."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return default
+            value, expires = item
+            if expires <= time.monotonic():
+                del self.data[key]
+                return default
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + self.ttl)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def pop(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+class RateLimit:
+    """
+    Up to `capacity` calls per key in each window of `period` seconds,
+    counted in the default cache with add() and incr(). Both are atomic in
+    the cache itself, so workers sharing it (Redis, Memcached) share the
+    limit. Across a window boundary a client can get 2 * capacity calls in.
+    """
+
+    def __init__(self, name, capacity, period):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+
+    def window(self, key):
+        """(cache key of the current window, seconds until it ends)"""
+        now = time.time()
+        start = int(now // self.period) * self.period
+        return f'ratelimit:{self.name}:{hashlib.md5(key.encode()).hexdigest()}:{start}', start + self.period - now
+
+    def take(self, key, count=True):
+        """0 if a call is allowed now (and counts it), else the seconds until one is."""
+        cache = caches['default']
+        cache_key, remaining = self.window(key)
+        if count:
+            cache.add(cache_key, 0, self.period)
+            try:
+                calls = cache.incr(cache_key)
+            except ValueError:
+                # the window's entry expired between add() and incr()
+                cache.add(cache_key, 1, self.period)
+                calls = 1
+        else:
+            calls = cache.get(cache_key, 0) + 1
+        return 0 if calls <= self.capacity else remaining
+
+    def peek(self, key):
+        """Like take() without counting the call."""
+        return self.take(key, count=False)
@@ -0,0 +1,133 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields, relations, serializers
+
+# DRF fields whose output can be produced from the raw column value without
+# the field machinery: None means the database value is used as is, a
+# string names the method of the bound field that converts it.
+CONVERTERS = {
+    fields.CharField: None,
+    fields.ChoiceField: None,
+    fields.EmailField: None,
+    fields.URLField: None,
+    fields.SlugField: None,
+    fields.IntegerField: None,
+    fields.BooleanField: None,
+    fields.ReadOnlyField: None,
+    relations.PrimaryKeyRelatedField: None,
+    fields.FloatField: float,
+    fields.UUIDField: 'to_representation',
+    fields.DateField: 'to_representation',
+    fields.DateTimeField: 'to_representation',
+    fields.TimeField: 'to_representation',
+    fields.DecimalField: 'to_representation',
+    fields.DurationField: 'to_representation',
+}
+
+
+class CompiledSerializer:
+    """
+    Read-only stand-in for `serializer(objs, many=True).data`: the rows are
+    read with .values_list() and turned into dicts without building model
+    instances or walking the serializer fields per row.
+    """
+
+    def __init__(self, keys, columns, converters, guards=()):
+        self.keys = keys
+        self.columns = columns
+        self.converted = [(key, convert) for key, convert in zip(keys, converters) if convert is not None]
+        # (key, column index): the key is left out when that relation is null,
+        # as DRF skips a read-only field whose source can't be reached
+        self.guards = guards
+
+    def to_row(self, row):
+        data = dict(zip(self.keys, row))
+        for key, index in self.guards:
+            if row[index] is None:
+                data.pop(key, None)
+        for key, convert in self.converted:
+            if key not in data:
+                continue
+            value = data[key]
+            if value is not None:
+                data[key] = convert(value)
+        return data
+
+    def values(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def rows(self, values):
+        return [self.to_row(row) for row in values]
+
+
+_compiled = {}
+
+
+def compile_serializer(serializer_class, field_names=None):
+    """
+    CompiledSerializer for the fields of `serializer_class` (or the subset in
+    field_names), or None when one of them needs the full serializer: method
+    fields, nested serializers, to-many relations, custom fields or an
+    overridden to_representation.
+    """
+    key = (serializer_class, field_names)
+    if key not in _compiled:
+        _compiled[key] = _compile(serializer_class, field_names)
+    return _compiled[key]
+
+
+def _compile(serializer_class, field_names):
+    if serializer_class.to_representation is not serializers.Serializer.to_representation:
+        return None
+    serializer = serializer_class()
+    model = serializer.Meta.model
+    keys, columns, converters, nullable = [], [], [], []
+    for name, field in serializer.fields.items():
+        if field.write_only or (field_names is not None and name not in field_names):
+            continue
+        if type(field) not in CONVERTERS or field.source == '*':
+            return None
+        path = _resolve(model, field.source.split('.'))
+        if path is None:
+            return None
+        column, null_relations = path
+        if null_relations and (field.required or field.allow_null or field.default is not fields.empty):
+            return None
+        convert = CONVERTERS[type(field)]
+        keys.append(name)
+        columns.append(column)
+        converters.append(getattr(field, convert) if isinstance(convert, str) else convert)
+        nullable.extend((name, relation) for relation in null_relations)
+    guards = []
+    for name, relation in nullable:
+        if relation not in columns:
+            columns.append(relation)
+        guards.append((name, columns.index(relation)))
+    return CompiledSerializer(keys, columns, converters, guards)
+
+
+def _resolve(model, bits):
+    """
+    (values_list() lookup, nullable relations crossed on the way) for a
+    source path, or None when it isn't a column reached through forward
+    relations.
+    """
+    null_relations = []
+    for i, bit in enumerate(bits[:-1]):
+        try:
+            field = model._meta.get_field(bit)
+        except FieldDoesNotExist:
+            return None
+        if not (field.many_to_one or field.one_to_one) or not field.concrete:
+            return None
+        if field.null:
+            null_relations.append('__'.join(bits[:i + 1]))
+        model = field.related_model
+    try:
+        field = model._meta.get_field(bits[-1])
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.many_to_many:
+        return None
+    if field.is_relation and len(bits) > 1:
+        return None
+    return '__'.join(bits), null_relations
@@ -0,0 +1,42 @@
+import hashlib
+from calendar import timegm
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from .counts import COUNT_CACHE_TIMEOUT, get_counter, model_label
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def to_timestamp(value):
+    return timegm(value.utctimetuple()) if value else None
+
+
+def get_list_state(queryset, params_key, version=None):
+    """
+    (MAX(updated_on), COUNT(*)) of a filtered list, computed in one query and
+    cached until the next write to the model.
+    """
+    label = model_label(queryset.model)
+    if version is None:
+        version = get_counter(queryset.model).version
+    key = f'state:{label}:{version}:{params_key}'
+    state = cache.get(key)
+    if state is None:
+        result = queryset.order_by().aggregate(last_modified=Max('updated_on'), count=Count('pk'))
+        state = (result['last_modified'], result['count'])
+        cache.set(key, state, COUNT_CACHE_TIMEOUT)
+    return state
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    # let clients keep the body but always revalidate it with us
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
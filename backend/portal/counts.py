@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlencode
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F
+
+COUNT_MODES = (None, 'false', 'approx', 'exact')
+COUNT_CACHE_TIMEOUT = 60 * 10
+
+_batch = threading.local()
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def get_counter(model):
+    from .models import ModelCounter
+    label = model_label(model)
+    counter = ModelCounter.objects.filter(label=label).first()
+    if counter is None:
+        counter, _ = ModelCounter.objects.get_or_create(
+            label=label, defaults={'row_count': model.objects.count()}
+        )
+    return counter
+
+
+def record_write(model, delta=0):
+    """Adjust the row count of `model` by delta and bump its version."""
+    from .models import ModelCounter
+    pending = getattr(_batch, 'deltas', None)
+    if pending is not None:
+        pending[model] = pending.get(model, 0) + delta
+        return
+    ModelCounter.objects.filter(label=model_label(model)).update(
+        row_count=F('row_count') + delta, version=F('version') + 1
+    )
+
+
+@contextmanager
+def batched_writes():
+    """Coalesce the record_write calls made inside the block into one UPDATE per model."""
+    if getattr(_batch, 'deltas', None) is not None:
+        yield
+        return
+    _batch.deltas = {}
+    try:
+        yield
+        deltas = _batch.deltas
+    finally:
+        _batch.deltas = None
+    for model, delta in deltas.items():
+        record_write(model, delta)
+
+
+def normalize_params(params, ignore=()):
+    items = sorted(
+        (key, value)
+        for key in params
+        if key not in ignore
+        for value in params.getlist(key)
+    )
+    return hashlib.md5(urlencode(items).encode()).hexdigest()
+
+
+def estimate_count(model):
+    """Planner estimate of the table size, or None if the backend has none."""
+    connection = connections[model.objects.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return row[0]
+
+
+def get_count(queryset, mode=None, params_key=''):
+    """
+    Count `queryset` according to mode:
+      false  -> no count at all (None)
+      exact  -> always run COUNT(*)
+      approx -> planner estimate for unfiltered lists where available
+      None   -> signal maintained counter when unfiltered, otherwise a count
+                cached per params_key until the next write to the model
+    """
+    if mode == 'false':
+        return None
+    if mode == 'exact':
+        return queryset.count()
+    model = queryset.model
+    if not queryset.query.where:
+        if mode == 'approx':
+            estimate = estimate_count(model)
+            if estimate is not None:
+                return estimate
+        return get_counter(model).row_count
+    counter = get_counter(model)
+    key = f'count:{counter.label}:{counter.version}:{params_key}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
@@ -0,0 +1,130 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+
+# lookup -> how its query param value is read
+OPERATORS = {
+    'exact': 'value',
+    'gt': 'value',
+    'gte': 'value',
+    'lt': 'value',
+    'lte': 'value',
+    'in': 'list',
+    'range': 'pair',
+    'isnull': 'bool',
+}
+BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+class FilterError(Exception):
+    pass
+
+
+def indexed_columns(model):
+    """Names of the fields an index can be used for when filtered on alone."""
+    opts = model._meta
+    names = {field.name for field in opts.concrete_fields if field.primary_key or field.unique or field.db_index}
+    for index in opts.indexes:
+        if index.fields:
+            names.add(index.fields[0].lstrip('-'))
+    for fields in list(opts.unique_together) + list(opts.index_together):
+        if fields:
+            names.add(fields[0])
+    return names
+
+
+_schemas = {}
+
+
+def get_filter_schema(model, allowed=()):
+    """
+    Filterable name -> model field: every indexed column of the model, plus
+    the names in `allowed`, which may also be paths across relations
+    (e.g. 'crop__name').
+    """
+    key = (model, tuple(allowed))
+    if key not in _schemas:
+        indexed = indexed_columns(model)
+        schema = {}
+        for field in model._meta.concrete_fields:
+            if field.name in indexed or field.name in allowed:
+                schema[field.name] = field
+                if field.is_relation:
+                    schema[field.attname] = field
+        for name in allowed:
+            if name not in schema:
+                schema[name] = _resolve_path(model, name)
+        _schemas[key] = schema
+    return _schemas[key]
+
+
+def _resolve_path(model, path):
+    field = None
+    for bit in path.split('__'):
+        if field is not None:
+            if not field.is_relation or field.related_model is None:
+                raise FieldDoesNotExist(f"{model._meta.label} has no field '{path}'")
+            model = field.related_model
+        field = model._meta.get_field(bit)
+    return field
+
+
+def _coerce(name, field, value):
+    if field.is_relation:
+        field = field.target_field
+    if isinstance(field, models.BooleanField):
+        value = BOOLEANS.get(value.lower(), value)
+    try:
+        value = field.to_python(value)
+    except ValidationError as e:
+        raise FilterError(f"Invalid value for {name}: " + " ".join(e.messages))
+    if field.choices and value not in dict(field.flatchoices):
+        raise FilterError(f"Invalid value for {name}: {value}")
+    return value
+
+
+def get_filters(model, params, ignore=(), allowed=()):
+    """
+    Turn query params into queryset.filter() kwargs, e.g.
+    price_date__gte=2024-01-01, status__in=PENDING,IN_PROGRESS,
+    due_date__range=2024-01-01,2024-01-31, plot__isnull=true.
+    Values are coerced with the model field; unknown fields, unknown
+    operators and columns without an index raise FilterError.
+    """
+    schema = get_filter_schema(model, allowed)
+    filters = {}
+    for param in params:
+        if param in ignore:
+            continue
+        name, operator = param, 'exact'
+        if '__' in param and param.rsplit('__', 1)[1] in OPERATORS:
+            name, operator = param.rsplit('__', 1)
+        field = schema.get(name)
+        if field is None:
+            if _is_field(model, name):
+                raise FilterError(f"Filtering on {name} is not supported")
+            raise FilterError(f"Unknown filter: {param}")
+        value = params[param]
+        kind = OPERATORS[operator]
+        if kind == 'bool':
+            if value.lower() not in BOOLEANS:
+                raise FilterError(f"{param} must be true or false")
+            value = BOOLEANS[value.lower()]
+        elif kind == 'list':
+            value = [_coerce(name, field, item) for item in value.split(',') if item]
+        elif kind == 'pair':
+            bounds = value.split(',')
+            if len(bounds) != 2:
+                raise FilterError(f"{param} takes two comma separated values")
+            value = [_coerce(name, field, bound) for bound in bounds]
+        else:
+            value = _coerce(name, field, value)
+        filters[param] = value
+    return filters
+
+
+def _is_field(model, name):
+    try:
+        _resolve_path(model, name)
+    except FieldDoesNotExist:
+        return False
+    return True
@@ -0,0 +1,70 @@
+import functools
+import logging
+import time
+from datetime import timedelta
+from uuid import uuid4
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import JobLock, JobRun
+
+logger = logging.getLogger(__name__)
+
+# Periodic jobs are plain functions returning the number of rows they changed,
+# wrapped with @periodic_job and listed in settings.CRONJOBS for
+# django_crontab (or run by hand with `manage.py run_job <path>`). A run
+# first takes the JobLock row of its name, so a run started while the last
+# one is still going is skipped instead of working the same rows twice; a
+# lock older than its timeout (a run that crashed) is taken over. Every run
+# leaves a JobRun.
+
+
+def acquire(name, seconds):
+    """Token of the lock on `name`, None if another run holds it."""
+    now = timezone.now()
+    token = uuid4().hex
+    until = now + timedelta(seconds=seconds)
+    try:
+        with transaction.atomic():
+            JobLock.objects.create(name=name, token=token, locked_until=until)
+        return token
+    except IntegrityError:
+        if JobLock.objects.filter(name=name, locked_until__lt=now).update(token=token, locked_until=until):
+            logger.warning("Took over the expired lock of job %s", name)
+            return token
+    return None
+
+
+def release(name, token):
+    JobLock.objects.filter(name=name, token=token).delete()
+
+
+def run_job(name, func, lock_timeout=None):
+    """Run func() under the lock of `name` and record it; returns the JobRun."""
+    started_on = timezone.now()
+    token = acquire(name, lock_timeout or settings.JOB_LOCK_TIMEOUT)
+    if token is None:
+        logger.info("Job %s is already running, skipped", name)
+        return JobRun.objects.create(name=name, status=JobRun.SKIPPED, started_on=started_on)
+    run = JobRun(name=name, status=JobRun.DONE, started_on=started_on)
+    started = time.monotonic()
+    try:
+        run.rows = func() or 0
+    except Exception as e:
+        logger.exception("Job %s failed", name)
+        run.status, run.message = JobRun.FAILED, str(e)[:255]
+    finally:
+        run.duration_ms = round((time.monotonic() - started) * 1000, 2)
+        run.save()
+        release(name, token)
+    logger.info("Job %s %s", name, run.status.lower(), extra={'rows': run.rows, 'duration_ms': run.duration_ms})
+    return run
+
+
+def periodic_job(name, lock_timeout=None):
+    def decorate(func):
+        @functools.wraps(func)
+        def run():
+            return run_job(name, func, lock_timeout)
+        return run
+    return decorate
@@ -0,0 +1,67 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from rest_framework.renderers import JSONRenderer
+from portal.compiled import compile_serializer
+from portal.renderers import ORJSONRenderer, orjson
+
+DEFAULT_VIEWS = [
+    'crop.views.MarketPriceAPIView',
+    'wholeseller.views.PriceHistoryAPIView',
+    'wholeseller.views.TransactionAPIView',
+]
+
+
+class Command(BaseCommand):
+    help = 'Time a list page through the DRF serializer and through the compiled .values() path, using existing rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', default=DEFAULT_VIEWS, help='dotted path of a BaseAPIView subclass')
+        parser.add_argument('--rows', type=int, default=100, help='rows per page')
+        parser.add_argument('--repeat', type=int, default=20, help='runs per path, the best one is reported')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, both paths render with json'))
+        for path in options['views']:
+            try:
+                view = import_string(path)()
+            except ImportError as e:
+                raise CommandError(str(e))
+            label = type(view).__name__
+            compiled = compile_serializer(view.serializer)
+            if compiled is None:
+                self.stdout.write(self.style.WARNING(f'{label}: {view.serializer.__name__} can not be compiled'))
+                continue
+            queryset = view.get_queryset()
+            rows = options['rows']
+
+            def drf():
+                objs = view.optimize_queryset(queryset)[:rows]
+                return JSONRenderer().render({'rows': view.serialize(objs, many=True)})
+
+            def fast():
+                return ORJSONRenderer().render({'rows': compiled.rows(compiled.values(queryset)[:rows])})
+
+            drf_body, fast_body = drf(), fast()
+            count = len(json.loads(drf_body)['rows'])
+            if not count:
+                self.stdout.write(self.style.WARNING(f'{label}: no rows to serialize'))
+                continue
+            if json.loads(drf_body) != json.loads(fast_body):
+                raise CommandError(f'{label}: compiled rows differ from the serializer output')
+            drf_time = self.best(drf, options['repeat'])
+            fast_time = self.best(fast, options['repeat'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: {count} rows  serializer {drf_time * 1000:.2f} ms  '
+                f'compiled {fast_time * 1000:.2f} ms  ({drf_time / fast_time:.1f}x)'
+            ))
+
+    def best(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from portal.search import get_backend, get_search_fields, searchable_models
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of every searchable model (or the given app_label.Model ones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='app_label.ModelName')
+
+    def handle(self, *args, **options):
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+        else:
+            models = searchable_models()
+        for model in models:
+            if not get_search_fields(model):
+                raise CommandError(f'{model._meta.label} does not declare search_fields')
+            backend = get_backend(model)
+            if backend is None:
+                self.stdout.write(self.style.WARNING(f'{model._meta.label}: no full-text support on this database'))
+                continue
+            backend.create_table(model)
+            backend.rebuild(model)
+            self.stdout.write(self.style.SUCCESS(f'{model._meta.label}: indexed {model.objects.count()} rows'))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = 'Run a periodic job now, e.g. crop.jobs.sweep_overdue_tasks; lists the scheduled jobs without one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job', nargs='?', help='dotted path of a @periodic_job function')
+
+    def handle(self, *args, **options):
+        if not options['job']:
+            for schedule, path, *rest in settings.CRONJOBS:
+                self.stdout.write(f'{schedule}  {path}')
+            return
+        try:
+            job = import_string(options['job'])
+        except ImportError as e:
+            raise CommandError(str(e))
+        run = job()
+        message = f'{run.name}: {run.status}, {run.rows} rows in {run.duration_ms} ms'
+        if run.status == run.FAILED:
+            raise CommandError(f'{message}: {run.message}')
+        self.stdout.write(self.style.SUCCESS(message))
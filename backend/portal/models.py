@@ -1,3 +1,4 @@
+from uuid import uuid4
 from django.db import models
 from .base import BaseModel
 # Create your models here.
@@ -6,4 +7,81 @@ class ContentManagement(BaseModel):
     name=models.CharField(max_length=50)
     description=models.TextField()
     main_content=models.TextField()
-    
\ No newline at end of file
+    
+
+class ModelCounter(models.Model):
+    """Row count and write version per model, kept current by portal.signals"""
+    label = models.CharField(max_length=100, primary_key=True)
+    row_count = models.BigIntegerField(default=0)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.label} ({self.row_count} rows, v{self.version})'
+
+
+class DeviceJob(models.Model):
+    """A request to a battery station, carried out in the background by core.apis"""
+    OPEN_EMPTY_SLOT = 'OPEN_EMPTY_SLOT'
+    GET_CHARGED_BATTERY = 'GET_CHARGED_BATTERY'
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    action = models.CharField(max_length=32, choices=[
+        (OPEN_EMPTY_SLOT, 'Open empty slot'),
+        (GET_CHARGED_BATTERY, 'Get charged battery'),
+    ])
+    status = models.CharField(max_length=16, choices=[
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ], default=PENDING)
+    success = models.BooleanField(null=True)
+    message = models.CharField(max_length=255, blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def __str__(self):
+        return f'{self.action} {self.status}'
+
+
+class JobLock(models.Model):
+    """Held by the periodic job (portal.jobs) that is running under this name"""
+    name = models.CharField(max_length=100, primary_key=True)
+    token = models.CharField(max_length=32)
+    locked_until = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name} until {self.locked_until}'
+
+
+class JobRun(models.Model):
+    """One run of a periodic job: when, how long, how many rows it changed"""
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    SKIPPED = 'SKIPPED'
+
+    name = models.CharField(max_length=100)
+    status = models.CharField(max_length=16, choices=[
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+        (SKIPPED, 'Skipped, already running'),
+    ])
+    rows = models.IntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    started_on = models.DateTimeField()
+    duration_ms = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['-started_on']
+        indexes = [models.Index(fields=['name', 'started_on'])]
+
+    def __str__(self):
+        return f'{self.name} {self.status} ({self.rows} rows)'
@@ -0,0 +1,47 @@
+import base64
+import json
+from uuid import UUID
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Keyset pagination walks (created_on, id) newest first, which matches the
+# default "-created_on" ordering of BaseAPIView with id as the tie breaker.
+CURSOR_ORDERING = ("-created_on", "-id")
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(obj):
+    payload = json.dumps([obj.created_on.isoformat(), str(obj.pk)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_on, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_on = parse_datetime(created_on)
+        pk = UUID(pk)
+    except (ValueError, TypeError, AttributeError):
+        raise InvalidCursor(cursor)
+    if created_on is None:
+        raise InvalidCursor(cursor)
+    return created_on, pk
+
+
+def paginate_by_cursor(queryset, cursor, limit):
+    """
+    Return (rows, next_cursor) for the page that follows `cursor`.
+    An empty cursor returns the first page; next_cursor is None on the last one.
+    """
+    queryset = queryset.order_by(*CURSOR_ORDERING)
+    if cursor:
+        created_on, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_on__lt=created_on) | Q(created_on=created_on, id__lt=pk)
+        )
+    rows = list(queryset[: limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -0,0 +1,134 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
+
+# (serializer class, field names) -> (select_related paths, prefetch_related paths)
+_plans = {}
+
+
+def get_plan(serializer_class, field_names=None):
+    """
+    Work out the select_related/prefetch_related paths a serializer needs so
+    that serializing a page of rows runs a fixed number of queries.
+    Dotted `source=` paths and nested serializers are followed; anything that
+    crosses a to-many relation is prefetched, the rest is joined.
+    The result is computed once per serializer class (and field subset).
+    """
+    key = (serializer_class, field_names)
+    if key not in _plans:
+        select, prefetch = set(), set()
+        serializer = serializer_class()
+        _plan_serializer(serializer, serializer.Meta.model, '', False, select, prefetch, field_names)
+        _plans[key] = (sorted(select), sorted(prefetch))
+    return _plans[key]
+
+
+def _follow_relations(model, bits):
+    path, many = [], False
+    for bit in bits:
+        try:
+            field = model._meta.get_field(bit)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        path.append(bit)
+        many = many or field.many_to_many or field.one_to_many
+        model = field.related_model
+    return path, many, model
+
+
+def _plan_serializer(serializer, model, prefix, in_prefetch, select, prefetch, field_names=None):
+    for name, field in serializer.fields.items():
+        if field_names is not None and name not in field_names:
+            continue
+        if field.source == '*' or getattr(field, 'write_only', False):
+            continue
+        bits = field.source.split('.')
+        nested = isinstance(field, serializers.BaseSerializer)
+        if isinstance(field, serializers.ListSerializer):
+            nested = True
+            field = field.child
+        elif not nested and not isinstance(field, ManyRelatedField):
+            # plain attribute: only the relations leading up to it matter
+            bits = bits[:-1]
+        path, many, related_model = _follow_relations(model, bits)
+        if not path:
+            continue
+        lookup = prefix + '__'.join(path)
+        prefetched = in_prefetch or many
+        (prefetch if prefetched else select).add(lookup)
+        if nested and isinstance(field, serializers.ModelSerializer):
+            _plan_serializer(field, related_model, lookup + '__', prefetched, select, prefetch)
+
+
+_columns = {}
+
+
+def get_serializer_fields(serializer_class):
+    key = (serializer_class, None)
+    if key not in _columns:
+        _columns[key] = tuple(serializer_class().fields)
+    return _columns[key]
+
+
+def get_columns(serializer_class, field_names):
+    """
+    Model columns needed to serialize `field_names`, suitable for .only(),
+    or None when a field reads the whole object and nothing can be left out.
+    """
+    key = (serializer_class, field_names)
+    if key not in _columns:
+        serializer = serializer_class()
+        model = serializer.Meta.model
+        columns = set()
+        for name, field in serializer.fields.items():
+            if name not in field_names or getattr(field, 'write_only', False):
+                continue
+            if field.source == '*':
+                columns = None
+                break
+            bits = field.source.split('.')
+            try:
+                model_field = model._meta.get_field(bits[0])
+            except FieldDoesNotExist:
+                # properties and methods may read any column
+                columns = None
+                break
+            if not model_field.concrete or model_field.many_to_many:
+                continue
+            columns.add(model_field.name)
+            if len(bits) > 1 and not isinstance(field, serializers.BaseSerializer):
+                # dotted source through joined relations: read just the target column
+                path, many, related_model = _follow_relations(model, bits[:-1])
+                if many or len(path) != len(bits) - 1:
+                    continue
+                try:
+                    target = related_model._meta.get_field(bits[-1])
+                except FieldDoesNotExist:
+                    target = None
+                if target is not None and target.concrete:
+                    columns.add('__'.join(bits))
+                else:
+                    columns.add('__'.join(path))
+        _columns[key] = None if columns is None else tuple(sorted(columns))
+    return _columns[key]
+
+
+_related_models = {}
+
+
+def get_related_models(serializer_class):
+    """Models other than the serializer's own whose data ends up in its output."""
+    if serializer_class not in _related_models:
+        model = serializer_class.Meta.model
+        select_related, prefetch_related = get_plan(serializer_class)
+        related = set()
+        for lookup in select_related + prefetch_related:
+            current = model
+            for bit in lookup.split('__'):
+                current = current._meta.get_field(bit).related_model
+                related.add(current)
+        related.discard(model)
+        _related_models[serializer_class] = sorted(related, key=lambda m: m._meta.label_lower)
+    return _related_models[serializer_class]
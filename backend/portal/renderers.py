@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson when it is installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=JSONEncoder().default)
+
+
+class RowsRenderer(BaseRenderer):
+    """
+    Renders the rows of a list response one record per line. The same
+    header()/encode() pair is used to stream exports batch by batch.
+    """
+    charset = 'utf-8'
+
+    def header(self, fields):
+        return ''
+
+    def encode(self, rows, fields):
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'rows' in data:
+            rows = data['rows']
+        else:
+            rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows else []
+        return (self.header(fields) + self.encode(rows, fields)).encode(self.charset)
+
+
+class NDJSONRenderer(RowsRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def encode(self, rows, fields):
+        return ''.join(json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n' for row in rows)
+
+
+class CSVRenderer(RowsRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def header(self, fields):
+        return self.encode([dict(zip(fields, fields))], fields)
+
+    def encode(self, rows, fields):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fields, extrasaction='ignore')
+        for row in rows:
+            # nested objects and lists don't fit in a cell, keep them as JSON
+            writer.writerow({
+                key: json.dumps(value, cls=JSONEncoder, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                for key, value in row.items()
+            })
+        return buffer.getvalue()
+
+
+def stream_rows(renderer, batches, fields):
+    yield renderer.header(fields)
+    for rows in batches:
+        yield renderer.encode(rows, fields)
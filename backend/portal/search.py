@@ -0,0 +1,200 @@
+import re
+from django.apps import apps
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+
+# Models opt in by declaring `search_fields = (...)`; each one gets its own
+# inverted index table next to the model table, kept current by portal.signals.
+# Searches join that table to the model's, so owner scope and filters apply
+# inside the ranked query.
+TOKEN_RE = re.compile(r'\w+')
+
+_fts5_available = {}
+
+
+def get_search_fields(model):
+    return getattr(model, 'search_fields', None)
+
+
+def searchable_models():
+    return [model for model in apps.get_models() if get_search_fields(model)]
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def get_document(instance):
+    values = (getattr(instance, field) for field in get_search_fields(instance))
+    return ' '.join(str(value) for value in values if value not in (None, ''))
+
+
+class SearchBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def table(self, model):
+        return self.connection.ops.quote_name(f'{model._meta.db_table}_search')
+
+    def execute(self, sql, params=()):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+
+    def create_table(self, model):
+        raise NotImplementedError
+
+    def index(self, instance):
+        raise NotImplementedError
+
+    def remove(self, model, pk):
+        raise NotImplementedError
+
+    def search(self, queryset, tokens):
+        """queryset joined to its index and narrowed to the rows matching every token, best first."""
+        raise NotImplementedError
+
+    def pk_column(self, model):
+        quote = self.connection.ops.quote_name
+        return f'{quote(model._meta.db_table)}.{quote(model._meta.pk.column)}'
+
+    def clear(self, model):
+        self.execute(f'DELETE FROM {self.table(model)}')
+
+    def rebuild(self, model, chunk_size=2000):
+        self.clear(model)
+        for instance in model.objects.only(*get_search_fields(model)).iterator(chunk_size=chunk_size):
+            self.index(instance)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 table with a prefix index. An FTS5 column can't be looked up by
+    value, so a plain table next to it hands out the rowid of each pk.
+    """
+
+    def ids_table(self, model):
+        return self.connection.ops.quote_name(f'{model._meta.db_table}_search_ids')
+
+    def create_table(self, model):
+        self.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.ids_table(model)} "
+            f"(rowid INTEGER PRIMARY KEY, object_id TEXT NOT NULL UNIQUE)"
+        )
+        self.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table(model)} "
+            f"USING fts5(object_id UNINDEXED, document, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+    def index(self, instance):
+        ids, object_id = self.ids_table(instance), str(instance.pk)
+        self.execute(f'INSERT OR IGNORE INTO {ids} (object_id) VALUES (%s)', [object_id])
+        self.execute(
+            f'INSERT OR REPLACE INTO {self.table(instance)} (rowid, object_id, document) '
+            f'SELECT rowid, object_id, %s FROM {ids} WHERE object_id = %s',
+            [get_document(instance), object_id],
+        )
+
+    def remove(self, model, pk):
+        ids = self.ids_table(model)
+        self.execute(
+            f'DELETE FROM {self.table(model)} WHERE rowid = (SELECT rowid FROM {ids} WHERE object_id = %s)',
+            [str(pk)],
+        )
+        self.execute(f'DELETE FROM {ids} WHERE object_id = %s', [str(pk)])
+
+    def clear(self, model):
+        super().clear(model)
+        self.execute(f'DELETE FROM {self.ids_table(model)}')
+
+    def search(self, queryset, tokens):
+        model = queryset.model
+        table = self.table(model)
+        # object_id holds str(pk); UUIDs are stored without dashes in SQLite
+        object_id = f"replace({table}.object_id, '-', '')" if isinstance(model._meta.pk, models.UUIDField) else f'{table}.object_id'
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.extra(
+            tables=[f'{model._meta.db_table}_search'],
+            where=[f'{table} MATCH %s', f'{object_id} = {self.pk_column(model)}'],
+            params=[match],
+        ).order_by(RawSQL(f'{table}.rank', ()).asc())
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector column under a GIN index, ranked with ts_rank."""
+
+    def create_table(self, model):
+        table = self.table(model)
+        self.execute(f'CREATE TABLE IF NOT EXISTS {table} (object_id text PRIMARY KEY, document tsvector NOT NULL)')
+        index = self.connection.ops.quote_name(f'{model._meta.db_table}_search_gin')
+        self.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} USING GIN (document)')
+
+    def index(self, instance):
+        self.execute(
+            f"INSERT INTO {self.table(instance)} (object_id, document) VALUES (%s, to_tsvector('simple', %s)) "
+            f"ON CONFLICT (object_id) DO UPDATE SET document = EXCLUDED.document",
+            [str(instance.pk), get_document(instance)],
+        )
+
+    def remove(self, model, pk):
+        self.execute(f'DELETE FROM {self.table(model)} WHERE object_id = %s', [str(pk)])
+
+    def search(self, queryset, tokens):
+        model = queryset.model
+        table = self.table(model)
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        return queryset.extra(
+            tables=[f'{model._meta.db_table}_search'],
+            where=[f"{table}.document @@ to_tsquery('simple', %s)", f'{table}.object_id = {self.pk_column(model)}::text'],
+            params=[query],
+        ).order_by(RawSQL(f"ts_rank({table}.document, to_tsquery('simple', %s))", (query,)).desc())
+
+
+def get_backend(model):
+    """Search backend for the database `model` lives in, or None if it has no full-text support."""
+    connection = connections[model.objects.db]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend(connection)
+    if connection.vendor == 'sqlite':
+        if connection.alias not in _fts5_available:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA compile_options')
+                _fts5_available[connection.alias] = ('ENABLE_FTS5',) in cursor.fetchall()
+        if _fts5_available[connection.alias]:
+            return SQLiteSearchBackend(connection)
+    return None
+
+
+def create_search_tables(**kwargs):
+    for model in searchable_models():
+        backend = get_backend(model)
+        if backend:
+            backend.create_table(model)
+
+
+def index_instance(instance):
+    backend = get_backend(type(instance))
+    if backend:
+        backend.index(instance)
+
+
+def remove_instance(instance):
+    backend = get_backend(type(instance))
+    if backend:
+        backend.remove(type(instance), instance.pk)
+
+
+def search_queryset(queryset, query):
+    """
+    Restrict queryset to the matches for query, ordered by relevance.
+    Returns None when the model has no index or the query has no words, so the
+    caller can fall back to a plain filter.
+    """
+    model = queryset.model
+    tokens = tokenize(query)
+    if not tokens or not get_search_fields(model):
+        return None
+    backend = get_backend(model)
+    if backend is None:
+        return None
+    return backend.search(queryset, tokens)
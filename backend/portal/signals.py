@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from .base import BaseModel
+from .counts import model_label, record_write
+from .search import get_search_fields, index_instance, remove_instance
+
+
+def tracked_models():
+    # users are tracked too because list serializers embed their names
+    user = get_user_model()
+    return [model for model in apps.get_models() if issubclass(model, BaseModel) or model is user]
+
+
+def track_save(sender, instance, created, **kwargs):
+    record_write(sender, 1 if created else 0)
+    if get_search_fields(sender):
+        index_instance(instance)
+
+
+def track_delete(sender, instance, **kwargs):
+    record_write(sender, -1)
+    if get_search_fields(sender):
+        remove_instance(instance)
+
+
+def connect():
+    """
+    Connect the receivers to each tracked model only, so saves and deletes of
+    every other model (and their fast-delete path) are left alone.
+    """
+    for model in tracked_models():
+        label = model_label(model)
+        post_save.connect(track_save, sender=model, dispatch_uid=f'portal.track_save.{label}')
+        post_delete.connect(track_delete, sender=model, dispatch_uid=f'portal.track_delete.{label}')
@@ -1,3 +1,320 @@
-from django.test import TestCase
+import json
+from datetime import date
+from uuid import UUID
+import jwt
+from django.conf import settings
+from django.http import QueryDict
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import path
+from accounts.models import User
+from crop.models import Crop, CropStock, FarmTask, Plot
+from crop.views import CropAPIView, PlotAPIView
+from .base import BaseAPIView, async_view
+from .batch import BatchAPIView
+from .cache import cached_for_versions
+from .counts import get_counter
+from .filters import FilterError, get_filters
+from .models import ModelCounter
+from .search import search_queryset
 
-# Create your tests here.
+
+def make_user(phone, **fields):
+    return User.objects.create_user(phone=phone, full_name=f'Farmer {phone}', email=f'{phone}@example.com', **fields)
+
+
+def auth(user):
+    return {'HTTP_AUTHORIZATION': jwt.encode({'user_id': str(user.pk)}, settings.JWT_SECRET, algorithm='HS256')}
+
+
+class PortalTestCase(TestCase):
+    def setUp(self):
+        # counts, validators and responses are cached under model versions,
+        # which start over with every test's database
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        self.user = make_user('9100000001')
+
+    def get(self, url, user=None, **headers):
+        return self.client.get(url, **auth(user or self.user), **headers)
+
+
+class CountTests(PortalTestCase):
+    def test_first_counter_read_counts_the_table(self):
+        for name in ('Wheat', 'Rice', 'Jowar'):
+            Crop.objects.create(name=name)
+        ModelCounter.objects.all().delete()
+        self.assertEqual(get_counter(Crop).row_count, 3)
+        self.assertEqual(self.get('/api/crop/').json()['count'], Crop.objects.count())
+
+    def test_create_and_delete_move_the_counter(self):
+        Crop.objects.create(name='Wheat')
+        before = get_counter(Crop)
+        rice = Crop.objects.create(name='Rice')
+        Crop.objects.create(name='Jowar')
+        rice.delete()
+        after = get_counter(Crop)
+        self.assertEqual(after.row_count, before.row_count + 1)
+        self.assertEqual(after.version, before.version + 3)
+        self.assertEqual(after.row_count, Crop.objects.count())
+
+    def test_count_modes(self):
+        for name in ('Wheat', 'Rice'):
+            Crop.objects.create(name=name)
+        url = '/api/crop/?limit=1'
+        self.assertEqual(self.get(url).json()['count'], 2)
+        self.assertEqual(self.get(url + '&count=exact').json()['count'], 2)
+        # no planner estimate on SQLite, so approx falls back to the counter
+        self.assertEqual(self.get(url + '&count=approx').json()['count'], 2)
+        data = self.get(url + '&count=false').json()
+        self.assertIsNone(data['count'])
+        self.assertEqual(len(data['rows']), 1)
+        self.assertEqual(self.get(url + '&count=maybe').status_code, 400)
+
+    def test_filtered_count_follows_writes(self):
+        wheat = Crop.objects.create(name='Wheat')
+        url = '/api/crop/?created_on__gte=' + wheat.created_on.isoformat().replace('+', '%2B')
+        self.assertEqual(self.get(url).json()['count'], 1)
+        Crop.objects.create(name='Rice')
+        self.assertEqual(self.get(url).json()['count'], 2)
+
+
+class SearchTests(PortalTestCase):
+    def search(self, query):
+        return set(search_queryset(Crop.objects.all(), query).values_list('name', flat=True))
+
+    def test_save_indexes_and_delete_removes(self):
+        wheat = Crop.objects.create(name='Wheat', variety='Lokwan')
+        self.assertEqual(self.search('lokwan'), {'Wheat'})
+        wheat.variety = 'Sharbati'
+        wheat.save()
+        self.assertEqual(self.search('lokwan'), set())
+        self.assertEqual(self.search('sharbati'), {'Wheat'})
+        wheat.delete()
+        self.assertEqual(self.search('sharbati'), set())
+
+    def test_every_token_must_match_as_a_prefix(self):
+        Crop.objects.create(name='Wheat', variety='Lokwan', description='Rabi season grain')
+        Crop.objects.create(name='Wheat', variety='Sharbati')
+        Crop.objects.create(name='Rice', description='Kharif grain')
+        self.assertEqual(self.search('whe'), {'Wheat'})
+        self.assertEqual(self.search('gra whe'), {'Wheat'})
+        self.assertEqual(search_queryset(Crop.objects.all(), 'gra whe').count(), 1)
+        self.assertEqual(self.search('gra'), {'Wheat', 'Rice'})
+        self.assertEqual(self.search('grain maize'), set())
+
+    def test_pks_sharing_low_bits_keep_their_own_entries(self):
+        low = 0x1234
+        first = Crop.objects.create(id=UUID(int=low | 1 << 100), name='Wheat')
+        Crop.objects.create(id=UUID(int=low | 1 << 101), name='Wheat durum')
+        self.assertEqual(self.search('wheat'), {'Wheat', 'Wheat durum'})
+        first.delete()
+        self.assertEqual(self.search('wheat'), {'Wheat durum'})
+
+    def test_q_with_cursor_and_stream(self):
+        for name in ('Wheat', 'Wheat durum', 'Wheat emmer', 'Rice'):
+            Crop.objects.create(name=name)
+        seen, url = [], '/api/crop/?q=whe&limit=2&cursor='
+        while url:
+            data = self.get(url).json()
+            seen += [row['name'] for row in data['rows']]
+            url = data['next'] and f'/api/crop/?q=whe&limit=2&cursor={data["next"]}'
+        self.assertEqual(sorted(seen), ['Wheat', 'Wheat durum', 'Wheat emmer'])
+        response = self.get('/api/crop/?q=whe&format=ndjson&stream=1')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(sorted(json.loads(line)['name'] for line in lines), ['Wheat', 'Wheat durum', 'Wheat emmer'])
+
+
+class ResponseCacheTests(PortalTestCase):
+    def test_write_to_an_embedded_model_retires_the_cached_list(self):
+        wheat = Crop.objects.create(name='Wheat')
+        CropStock.objects.create(crop=wheat, farmer=self.user, quantity_on_hold=10)
+        names = lambda: [row['crop_name'] for row in self.get('/api/crop/stocks/').json()['rows']]
+        self.assertEqual(names(), ['Wheat'])
+        # QuerySet.update() sends no signal, so the cached page is still served
+        Crop.objects.filter(pk=wheat.pk).update(name='Durum')
+        self.assertEqual(names(), ['Wheat'])
+        wheat.name = 'Sharbati'
+        wheat.save()
+        self.assertEqual(names(), ['Sharbati'])
+
+    def test_cached_for_versions(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(cached_for_versions('test', [Crop], 'a', build), 1)
+        self.assertEqual(cached_for_versions('test', [Crop], 'a', build), 1)
+        self.assertEqual(cached_for_versions('test', [Crop], 'b', build), 2)
+        CropStock.objects.create(crop=Crop.objects.create(name='Wheat'), farmer=self.user)
+        self.assertEqual(cached_for_versions('test', [Crop], 'a', build), 3)
+
+
+class FilterTests(PortalTestCase):
+    def setUp(self):
+        super().setUp()
+        for title, status, priority, day in (
+            ('Sow', 'PENDING', 'HIGH', 1),
+            ('Weed', 'IN_PROGRESS', 'LOW', 10),
+            ('Harvest', 'COMPLETED', 'HIGH', 20),
+        ):
+            FarmTask.objects.create(title=title, status=status, priority=priority, due_date=date(2024, 1, day), farmer=self.user)
+
+    def titles(self, query):
+        response = self.get('/api/crop/tasks/?' + query)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(row['title'] for row in response.json()['rows'])
+
+    def error(self, query):
+        response = self.get('/api/crop/tasks/?' + query)
+        self.assertEqual(response.status_code, 400)
+        return response.json()['msg']
+
+    def test_in_and_range_values_are_coerced(self):
+        self.assertEqual(self.titles('status__in=PENDING,COMPLETED'), ['Harvest', 'Sow'])
+        self.assertEqual(self.titles('due_date__range=2024-01-05,2024-01-31'), ['Harvest', 'Weed'])
+        self.assertEqual(self.titles('due_date__gte=2024-01-10&status=IN_PROGRESS'), ['Weed'])
+        self.assertIn('two comma separated values', self.error('due_date__range=2024-01-05'))
+        self.assertIn('Invalid value for due_date', self.error('due_date__gte=someday'))
+
+    def test_choice_values_are_validated(self):
+        self.assertIn('Invalid value for status', self.error('status=BOGUS'))
+        self.assertIn('Invalid value for status', self.error('status__in=PENDING,BOGUS'))
+
+    def test_unindexed_fields_and_unknown_operators_are_rejected(self):
+        self.assertEqual(self.error('title=Sow'), 'Filtering on title is not supported')
+        self.assertEqual(self.error('due_date__near=2024-01-01'), 'Unknown filter: due_date__near')
+        self.assertEqual(self.error('colour=red'), 'Unknown filter: colour')
+
+    def test_filter_fields_opt_in(self):
+        # FarmTaskAPIView lists priority in filter_fields although it has no index
+        self.assertEqual(self.titles('priority=HIGH'), ['Harvest', 'Sow'])
+        with self.assertRaises(FilterError):
+            get_filters(FarmTask, QueryDict('priority=HIGH'))
+        self.assertEqual(get_filters(FarmTask, QueryDict('priority__in=HIGH,LOW'), allowed=['priority']), {'priority__in': ['HIGH', 'LOW']})
+
+
+class ConditionalGetTests(PortalTestCase):
+    url = '/api/crop/stocks/'
+
+    def setUp(self):
+        super().setUp()
+        self.wheat = Crop.objects.create(name='Wheat')
+        self.stock = CropStock.objects.create(crop=self.wheat, farmer=self.user, quantity_on_hold=10)
+
+    def etag(self, url=None, user=None):
+        response = self.get(url or self.url, user)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_matching_etag_gets_304(self):
+        response = self.get(self.url)
+        etag = response['ETag']
+        self.assertIn('Authorization', response['Vary'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        detail = f'{self.url}{self.stock.pk}/'
+        self.assertEqual(self.get(detail, HTTP_IF_NONE_MATCH=self.etag(detail)).status_code, 304)
+
+    def test_writes_and_filters_change_the_etag(self):
+        etag = self.etag()
+        self.assertNotEqual(self.etag(self.url + '?limit=1'), etag)
+        self.assertNotEqual(self.etag(self.url + f'?crop={self.wheat.pk}'), etag)
+        self.stock.quantity_on_hold = 20
+        self.stock.save()
+        after_write = self.etag()
+        self.assertNotEqual(after_write, etag)
+        self.assertEqual(self.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.wheat.name = 'Durum'
+        self.wheat.save()
+        self.assertNotEqual(self.etag(), after_write)
+
+    def test_etag_is_per_scoped_user(self):
+        other = make_user('9100000002')
+        CropStock.objects.create(crop=self.wheat, farmer=other, quantity_on_hold=10)
+        etag = self.etag()
+        self.assertNotEqual(self.etag(user=other), etag)
+        self.assertEqual(self.get(self.url, other, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+AsyncPlotAPIView = async_view(PlotAPIView)
+urlpatterns = [
+    path('api/crop/', async_view(CropAPIView).as_view()),
+    path('api/plots/', AsyncPlotAPIView.as_view()),
+    path('api/plots/<uuid:id>/', AsyncPlotAPIView.as_view()),
+    path('api/batch', BatchAPIView.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF='portal.tests')
+class AsyncViewTests(PortalTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = make_user('9100000002')
+        self.plots = [Plot.objects.create(name=name, area=1, farmer=self.user) for name in ('North', 'South')]
+        self.others_plot = Plot.objects.create(name='East', area=1, farmer=self.other)
+
+    def headers(self, user=None):
+        return {'Authorization': auth(user or self.user)['HTTP_AUTHORIZATION']}
+
+    async def request(self, method, url, data=None, user=None):
+        return await getattr(self.async_client, method)(
+            url, data, content_type='application/json', headers=self.headers(user),
+        ) if data is not None else await getattr(self.async_client, method)(url, headers=self.headers(user))
+
+    async def test_list_is_scoped_paged_and_filtered(self):
+        data = (await self.request('get', '/api/plots/')).json()
+        self.assertEqual((data['count'], sorted(row['name'] for row in data['rows'])), (2, ['North', 'South']))
+        self.assertEqual(data['rows'][0]['farmer_name'], self.user.full_name)
+        data = (await self.request('get', '/api/plots/?limit=1&count=exact&fields=name')).json()
+        self.assertEqual((data['count'], list(data['rows'][0])), (2, ['name']))
+        data = (await self.request('get', '/api/plots/?limit=1&cursor=')).json()
+        data = (await self.request('get', f'/api/plots/?limit=1&cursor={data["next"]}')).json()
+        self.assertEqual((data['rows'][0]['name'], data['next']), ('North', None))
+        response = await self.request('get', '/api/plots/?soil_type=LOAMY')
+        self.assertEqual(response.status_code, 400)
+        data = (await self.request('get', '/api/crop/', user=self.other)).json()
+        self.assertEqual(data['count'], 0)
+
+    async def test_detail_is_scoped(self):
+        response = await self.request('get', f'/api/plots/{self.plots[0].pk}/')
+        self.assertEqual(response.json()['name'], 'North')
+        response = await self.request('get', f'/api/plots/{self.others_plot.pk}/')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_writes_are_scoped(self):
+        response = await self.request('post', '/api/plots/', {'name': 'West', 'area': 2, 'farmer': str(self.other.pk)})
+        self.assertEqual(response.status_code, 201)
+        plot = await Plot.objects.aget(pk=response.json()['id'])
+        self.assertEqual(plot.farmer_id, self.user.pk)
+        response = await self.request('put', f'/api/plots/{plot.pk}/', {'area': 3})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((await Plot.objects.aget(pk=plot.pk)).area, 3)
+        response = await self.request('put', f'/api/plots/{self.others_plot.pk}/', {'area': 3})
+        self.assertEqual(response.status_code, 400)
+        response = await self.request('delete', f'/api/plots/{plot.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(await Plot.objects.filter(pk=plot.pk).aexists())
+
+    def test_can_be_batched(self):
+        response = self.client.post('/api/batch', {'requests': [
+            {'path': '/plots/?fields=name'},
+            {'path': f'/plots/{self.plots[1].pk}/'},
+        ]}, content_type='application/json', **auth(self.user))
+        first, second = response.json()['responses']
+        self.assertEqual((first['status'], first['body']['count']), (200, 2))
+        self.assertEqual(second['body']['name'], 'South')
+
+    def test_handlers_are_not_copied(self):
+        class CustomView(BaseAPIView):
+            model = Plot
+
+            def get(self, request, id=None):
+                pass
+
+        with self.assertRaises(TypeError):
+            async_view(CustomView)
@@ -1,6 +1,9 @@
+import logging
 import requests
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 def aadhaar_otp_generate(aadhaar_number):
 
@@ -15,9 +18,7 @@ def aadhaar_otp_generate(aadhaar_number):
     }
     response = requests.post(url, json=payload, headers=headers)
 
-    print(response.text)
-    print(response.json,'--------------------------jjjjj')
-    print('>>>>>>>>>>>>>>>>>>>> def aadhaar res',response)
+    logger.debug("Aadhaar OTP request returned %s", response.status_code)
     return response
 
 # status 200
@@ -52,8 +53,7 @@ def verify_aadhaar(otp,ref_id):
 
     response = requests.post(url, json=payload, headers=headers)
 
-    print(response.text)
-    print('>>>>>>>>>>>>>>>>>>>> def aadhaar verify',response)
+    logger.debug("Aadhaar verification for ref %s returned %s", ref_id, response.status_code)
     return response
 # status 200 
 # { 
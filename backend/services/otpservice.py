@@ -1,7 +1,10 @@
 import json
+import logging
 import requests
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 def send_otp(mobile_number, params={}):
     url = f"https://control.msg91.com/api/v5/otp"
     payload = json.dumps(params)
@@ -43,5 +46,5 @@ def resend_otp(mobile_number):
         'mobile': f"{settings.COUNTRY_CODE_MOBILE}{mobile_number}"
     }
     response = requests.get(url, params=query_params)
-    print('resend otp >>>>>>>>>>>>>>>>>>>>>>>> in resend functions', response.text)
+    logger.debug("OTP resend returned %s", response.status_code)
     return response.json()
\ No newline at end of file
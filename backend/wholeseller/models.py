@@ -4,6 +4,8 @@ from portal.base import BaseModel
 from decimal import Decimal
 
 class Wholesaler(BaseModel):
+    search_fields = ('name', 'location')
+
     name = models.CharField(max_length=128)
     location = models.CharField(max_length=255)
     contact_number = models.CharField(max_length=15, unique=True)
@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.urls import path
+from portal.base import async_view
 from .views import (
     WholesalerAPIView, WholesalerCropAPIView,
     SupplyRequestAPIView, TransactionAPIView, WholesalerInventoryAPIView,
@@ -6,18 +8,23 @@ from .views import (
 )
 from crop.views import PlotAPIView
 
+PlotView, WholesalerView, WholesalerCropView, PriceHistoryView = (
+    async_view(view) if settings.ASYNC_VIEWS else view
+    for view in (PlotAPIView, WholesalerAPIView, WholesalerCropAPIView, PriceHistoryAPIView)
+)
+
 urlpatterns = [
     # Plots
-    path('plots/', PlotAPIView.as_view(), name='plot-list'),
-    path('plots/<uuid:id>/', PlotAPIView.as_view(), name='plot-detail'),
+    path('plots/', PlotView.as_view(), name='plot-list'),
+    path('plots/<uuid:id>/', PlotView.as_view(), name='plot-detail'),
 
     # Wholesalers
-    path('wholesalers/', WholesalerAPIView.as_view(), name='wholesaler-list'),
-    path('wholesalers/<uuid:id>/', WholesalerAPIView.as_view(), name='wholesaler-detail'),
+    path('wholesalers/', WholesalerView.as_view(), name='wholesaler-list'),
+    path('wholesalers/<uuid:id>/', WholesalerView.as_view(), name='wholesaler-detail'),
 
     # Wholesaler Crops
-    path('wholesaler-crops/', WholesalerCropAPIView.as_view(), name='wholesaler-crop-list'),
-    path('wholesaler-crops/<uuid:id>/', WholesalerCropAPIView.as_view(), name='wholesaler-crop-detail'),
+    path('wholesaler-crops/', WholesalerCropView.as_view(), name='wholesaler-crop-list'),
+    path('wholesaler-crops/<uuid:id>/', WholesalerCropView.as_view(), name='wholesaler-crop-detail'),
 
     # Supply Requests
     path('supply-requests/', SupplyRequestAPIView.as_view(), name='supply-request-list'),
@@ -32,6 +39,6 @@ urlpatterns = [
     path('wholesaler-inventories/<uuid:id>/', WholesalerInventoryAPIView.as_view(), name='wholesaler-inventory-detail'),
 
     # Price History
-    path('price-history/', PriceHistoryAPIView.as_view(), name='price-history-list'),
-    path('price-history/<uuid:id>/', PriceHistoryAPIView.as_view(), name='price-history-detail'),
+    path('price-history/', PriceHistoryView.as_view(), name='price-history-list'),
+    path('price-history/<uuid:id>/', PriceHistoryView.as_view(), name='price-history-detail'),
 ]
@@ -19,6 +19,7 @@ const CurrentCropStocks = () => {
   const [success, setSuccess] = useState("");
   const [stocks, setStocks] = useState([]);
   const [crops, setCrops] = useState([]);
+  const [totals, setTotals] = useState(null);
 
   const [formData, setFormData] = useState({
     crop: "",
@@ -39,12 +40,14 @@ const CurrentCropStocks = () => {
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [stocksRes, cropsRes] = await Promise.all([
+      const [stocksRes, cropsRes, totalsRes] = await Promise.all([
         cropStocksAPI.getAll(),
         cropsAPI.getAll(),
+        cropStocksAPI.getTotals(),
       ]);
       setStocks(stocksRes.rows || []);
       setCrops(cropsRes.rows || []);
+      setTotals(totalsRes.totals || null);
     } catch (err) {
       setError("Failed to load data");
     } finally {
@@ -171,6 +174,14 @@ const CurrentCropStocks = () => {
           <h2 className="text-xl font-bold text-gray-800 mb-4">
             Your Crop Stocks ({stocks.length})
           </h2>
+          {totals && (
+            <p className="text-gray-600 mb-4">
+              Total on hold:{" "}
+              <span className="font-semibold">{totals.on_hold} kg</span>
+              {" · "}Total sold:{" "}
+              <span className="font-semibold">{totals.sold} kg</span>
+            </p>
+          )}
           <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
             {stocks.map((stock) => (
               <div
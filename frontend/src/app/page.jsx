@@ -7,11 +7,8 @@ import { PageWraper } from "../app/hoc";
 import {
   isAuthenticated,
   getUser,
-  plotsAPI,
-  cropsAPI,
-  cropPlanningAPI,
-  tasksAPI,
   marketPricesAPI,
+  batchAPI,
 } from "../services/api";
 import { useLanguage } from "../context/LanguageContext";
 
@@ -526,19 +523,22 @@ const HomePage = () => {
 
   const fetchStats = async () => {
     try {
-      const [plotsRes, cropsRes, plansRes, tasksRes] = await Promise.all([
-        plotsAPI.getAll().catch(() => ({ rows: [] })),
-        cropsAPI.getAll().catch(() => ({ rows: [] })),
-        cropPlanningAPI.getAll().catch(() => ({ rows: [] })),
-        tasksAPI.getAll().catch(() => ({ rows: [] })),
-      ]);
+      const responses = await batchAPI.run(
+        [
+          { method: "GET", path: "/crop/dashboard-summary/" },
+          { method: "GET", path: "/crop/?limit=1&fields=id" },
+          { method: "GET", path: "/crop/tasks/" },
+        ],
+        { parallel: true },
+      );
+      const [summaryRes, cropsRes, tasksRes] = responses.map((res) =>
+        res.status === 200 ? res.body : {},
+      );
       setStats({
-        plots: plotsRes.rows?.length || 0,
-        crops: cropsRes.rows?.length || 0,
-        plans: plansRes.rows?.length || 0,
-        tasks: (tasksRes.rows || []).filter(
-          (t) => t.status === "PENDING" || t.status === "IN_PROGRESS",
-        ).length,
+        plots: summaryRes.plots?.count || 0,
+        crops: cropsRes.count || 0,
+        plans: summaryRes.crop_plans?.total || 0,
+        tasks: summaryRes.tasks?.open || 0,
       });
       setTasks(tasksRes.rows || []);
     } catch (err) {
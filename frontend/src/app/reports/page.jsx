@@ -1,22 +1,134 @@
 "use client";
-import React from "react";
+import React, { useState, useEffect } from "react";
+import { useRouter } from "next/navigation";
 import { PageWraper } from "../hoc";
+import { SelectInput } from "../components/inputs";
+import { tasksAPI, isAuthenticated } from "../../services/api";
+
+const GROUPS = ["month", "plot", "crop", "task_type"];
+
+const groupLabel = (row, group) => {
+  if (group === "month") return row.month?.slice(0, 7);
+  if (group === "plot") return row.plot_name || "No plot";
+  if (group === "crop") return row.crop_name || "No crop";
+  return row.task_type;
+};
+
+const formatNumber = (value) => Number(value || 0).toLocaleString();
 
 const Reports = () => {
+  const router = useRouter();
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState("");
+  const [group, setGroup] = useState("month");
+  const [report, setReport] = useState(null);
+
+  useEffect(() => {
+    if (!isAuthenticated()) {
+      router.push("/auth/signin");
+      return;
+    }
+    fetchReport(group);
+  }, [group]);
+
+  const fetchReport = async (groupBy) => {
+    setLoading(true);
+    setError("");
+    try {
+      setReport(await tasksAPI.getReport({ group: groupBy }));
+    } catch (err) {
+      setError("Failed to load report");
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const renderRow = (row, label, key, className = "") => (
+    <tr key={key} className={className}>
+      <td className="py-3 px-4 font-medium text-gray-800">{label}</td>
+      <td className="py-3 px-4 text-right text-gray-600">
+        {row.completed} / {row.tasks}
+      </td>
+      <td className="py-3 px-4 text-right text-gray-600">
+        ₹{formatNumber(row.cost)}
+      </td>
+      <td className="py-3 px-4 text-right text-gray-600">
+        {formatNumber(row.estimated_hours)} h
+      </td>
+      <td className="py-3 px-4 text-right text-gray-600">
+        {formatNumber(row.actual_hours)} h
+      </td>
+      <td
+        className={`py-3 px-4 text-right ${
+          row.hours_variance > 0 ? "text-red-600" : "text-green-600"
+        }`}
+      >
+        {row.hours_variance_pct === null
+          ? "—"
+          : `${row.hours_variance > 0 ? "+" : ""}${row.hours_variance_pct}%`}
+      </td>
+    </tr>
+  );
+
   return (
     <main className="form-container">
       <h1 className="form-heading">Reports</h1>
 
-      <div className="bg-blue-50 border border-blue-200 rounded-lg p-6 text-center">
-        <div className="text-5xl mb-4">📈</div>
-        <h2 className="text-xl font-bold text-gray-800 mb-2">Coming Soon</h2>
-        <p className="text-gray-600">
-          The Reports feature is under development.
-          <br />
-          You'll be able to view detailed farm analytics and generate reports
-          here.
-        </p>
+      {error && (
+        <div className="bg-red-50 border border-red-200 text-red-600 px-4 py-3 rounded-lg mb-4">
+          {error}
+        </div>
+      )}
+
+      <div className="max-w-xs mb-6">
+        <SelectInput
+          label="Group tasks by"
+          options={GROUPS}
+          value={group}
+          onChange={(e) => setGroup(e.target.value)}
+        />
       </div>
+
+      {loading ? (
+        <p className="text-gray-600">Loading report...</p>
+      ) : report && report.rows.length > 0 ? (
+        <div className="bg-white rounded-xl border border-gray-200 overflow-hidden">
+          <div className="overflow-x-auto">
+            <table className="w-full">
+              <thead className="bg-gray-50">
+                <tr>
+                  <th className="py-3 px-4 text-left font-semibold text-gray-700">
+                    {group.replace("_", " ")}
+                  </th>
+                  <th className="py-3 px-4 text-right font-semibold text-gray-700">
+                    Completed / Tasks
+                  </th>
+                  <th className="py-3 px-4 text-right font-semibold text-gray-700">
+                    Cost
+                  </th>
+                  <th className="py-3 px-4 text-right font-semibold text-gray-700">
+                    Estimated
+                  </th>
+                  <th className="py-3 px-4 text-right font-semibold text-gray-700">
+                    Actual
+                  </th>
+                  <th className="py-3 px-4 text-right font-semibold text-gray-700">
+                    Variance
+                  </th>
+                </tr>
+              </thead>
+              <tbody className="divide-y divide-gray-100">
+                {report.rows.map((row, index) =>
+                  renderRow(row, groupLabel(row, group), index)
+                )}
+                {renderRow(report.totals, "Total", "total", "bg-gray-50 font-semibold")}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      ) : (
+        <p className="text-gray-600">No tasks to report yet.</p>
+      )}
     </main>
   );
 };
@@ -452,6 +452,13 @@ export const cropStocksAPI = {
   delete: async (id) => {
     return apiRequest(`/crop/stocks/${id}/`, { method: "DELETE" });
   },
+
+  /**
+   * Get stock on hold and sold per crop, with overall totals
+   */
+  getTotals: async () => {
+    return apiRequest("/crop/stocks/totals/");
+  },
 };
 
 // ============================================
@@ -721,6 +728,14 @@ export const tasksAPI = {
   delete: async (id) => {
     return apiRequest(`/crop/tasks/${id}/`, { method: "DELETE" });
   },
+
+  /**
+   * Get task cost and hours totals, grouped by plot, crop, task_type and/or month
+   */
+  getReport: async (params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    return apiRequest(`/crop/tasks/report/${queryString ? "?" + queryString : ""}`);
+  },
 };
 
 // ============================================
@@ -823,6 +838,25 @@ export const marketPricesAPI = {
   },
 };
 
+// ============================================
+// BATCH API
+// ============================================
+
+export const batchAPI = {
+  /**
+   * Run several API calls in one round trip.
+   * requests: [{ method, path, body }] with paths relative to the API base URL.
+   * Resolves to [{ status, body }] in the same order.
+   */
+  run: async (requests, { parallel = false } = {}) => {
+    const data = await apiRequest("/batch", {
+      method: "POST",
+      body: JSON.stringify({ requests, parallel }),
+    });
+    return data.responses || [];
+  },
+};
+
 export default {
   authAPI,
   cropsAPI,
@@ -837,6 +871,7 @@ export default {
   tasksAPI,
   resourcesAPI,
   marketPricesAPI,
+  batchAPI,
   getToken,
   setToken,
   removeToken,